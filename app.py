@@ -5,13 +5,22 @@ A FastAPI application for real-time stock analysis with WebSocket support.
 Provides ticker validation and interactive stock analysis reports.
 """
 
+import asyncio
+
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from backend.api import api_router
 from backend.api.routes.websocket import websocket_endpoint
-from backend.core import CORS_ORIGINS
+from backend.core import (
+    CORS_ORIGINS,
+    EXECUTOR,
+    WEB_CONCURRENCY,
+    close_async_http_client,
+    get_async_http_client,
+    shutdown_process_pool,
+)
 from stock_analyser.utils.logger import logger
 
 # Create FastAPI application
@@ -26,10 +35,35 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["content-type", "authorization"],
+    max_age=86400,  # Let browsers cache preflight responses for a day
 )
 
+@app.on_event("startup")
+async def configure_executor():
+    """Use the bounded shared thread pool as the loop's default executor."""
+    asyncio.get_running_loop().set_default_executor(EXECUTOR)
+
+
+@app.on_event("startup")
+async def open_http_client():
+    """Create the shared async HTTP client before the first request."""
+    app.state.http = get_async_http_client()
+
+
+@app.on_event("shutdown")
+async def shutdown_http_client():
+    """Close the shared async HTTP client on shutdown."""
+    await close_async_http_client()
+
+
+@app.on_event("shutdown")
+async def shutdown_analysis_pool():
+    """Stop the analysis worker processes on shutdown."""
+    shutdown_process_pool()
+
+
 # Include API routes
 app.include_router(api_router)
 
@@ -58,4 +92,17 @@ async def health_check():
 
 if __name__ == "__main__":
     logger.info("Starting Stock Analyzer API server...")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Workers don't share state, so /ws/report needs sticky sessions
+    # (e.g. nginx ip_hash) when running behind a load balancer. Analyses run
+    # in each worker's crew process pool, so one worker is usually enough.
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=WEB_CONCURRENCY,
+        loop="uvloop",
+        http="httptools",
+        ws="websockets",
+        # Compress WebSocket frames; markdown reports shrink considerably
+        ws_per_message_deflate=True,
+    )
@@ -1,19 +1,58 @@
 """Ticker validation API endpoint."""
 
-from fastapi import APIRouter, HTTPException
+import re
 
-from backend.models import TickerValidationRequest
-from backend.core import get_finnhub_client
+from fastapi import APIRouter, Depends, HTTPException
+
+from backend.models import TickerValidationRequest, parse_ticker_request
+from backend.core import (
+    FINNHUB_API_BASE_URL,
+    get_async_http_client,
+    get_finnhub_api_key,
+)
+from stock_analyser.utils.cache import TTLCache
 from stock_analyser.utils.logger import logger
 
 router = APIRouter()
 
-# Initialize Finnhub client
-finnhub_client = get_finnhub_client()
+# Plausible exchange symbols; anything else is rejected without calling Finnhub
+TICKER_RE = re.compile(r"^[A-Z0-9.\-]{1,10}$")
+
+# Finnhub company profile endpoint
+PROFILE_URL = f"{FINNHUB_API_BASE_URL}/stock/profile2"
+
+# Profile lookups change on the order of days; unknown tickers (typos) are
+# cached for a shorter period in case they get listed.
+PROFILE_CACHE_TTL = 3600
+NEGATIVE_CACHE_TTL = 300
+_profile_cache = TTLCache(maxsize=4096, ttl=PROFILE_CACHE_TTL)
+
+
+async def _fetch_profile(ticker: str, api_key: str) -> dict:
+    """
+    Fetch the Finnhub company profile for a ticker, using the TTL cache.
+
+    Returns an empty dict if the ticker does not exist. API errors are
+    raised and never cached.
+    """
+    cached = _profile_cache.get(ticker)
+    if cached is not None:
+        return cached
+
+    client = get_async_http_client()
+    resp = await client.get(PROFILE_URL, params={"symbol": ticker, "token": api_key})
+    resp.raise_for_status()
+    profile = resp.json() or {}
+
+    if profile.get('ticker'):
+        _profile_cache.set(ticker, profile)
+    else:
+        _profile_cache.set(ticker, profile, ttl=NEGATIVE_CACHE_TTL)
+    return profile
 
 
 @router.post("/validate-ticker")
-async def validate_ticker(request: TickerValidationRequest):
+async def validate_ticker(request: TickerValidationRequest = Depends(parse_ticker_request)):
     """
     Validate if a stock ticker symbol exists in the market.
     Returns ticker information if valid, or error if invalid.
@@ -24,12 +63,20 @@ async def validate_ticker(request: TickerValidationRequest):
     Returns:
         dict: Validation result with company information
     """
-    ticker = request.ticker.upper().strip()
+    ticker = request.ticker
     
     if not ticker:
         raise HTTPException(status_code=400, detail="Ticker symbol is required")
+
+    if not TICKER_RE.fullmatch(ticker):
+        return {
+            "valid": False,
+            "ticker": ticker,
+            "message": "Malformed symbol"
+        }
     
-    if not finnhub_client:
+    api_key = get_finnhub_api_key()
+    if not api_key:
         # If Finnhub is not available, do basic format validation only
         return {
             "valid": True,
@@ -40,7 +87,7 @@ async def validate_ticker(request: TickerValidationRequest):
     
     try:
         # Try to get company profile to validate ticker exists
-        profile = finnhub_client.company_profile2(symbol=ticker)
+        profile = await _fetch_profile(ticker, api_key)
         
         # Check if we got valid data back
         if profile and profile.get('ticker'):
@@ -1,39 +1,18 @@
 """WebSocket endpoint for stock analysis."""
 
 import asyncio
-from typing import Optional, Dict, Any, Callable, Awaitable
+from typing import Optional
+
+import msgspec
 from fastapi import WebSocket, WebSocketDisconnect
 
-from backend.services import run_stock_analysis
+from backend.models import ControlMessage
+from backend.services import run_stock_analysis, send_orjson
 from stock_analyser.utils.logger import logger
 
 
-# Type alias for action handlers
-ActionHandler = Callable[[Dict[str, Any], WebSocket, Optional[asyncio.Task], Optional[str]], Awaitable[bool]]
-
-
-async def handle_cancel_action(
-    message: Dict[str, Any],
-    websocket: WebSocket,
-    analysis_task: Optional[asyncio.Task],
-    stock_ticker: Optional[str]
-) -> bool:
-    """
-    Handle cancel action from client.
-    
-    Returns:
-        bool: True to stop listening for more messages, False to continue
-    """
-    logger.info(f"Received cancel request for {stock_ticker or 'unknown'}")
-    if analysis_task and not analysis_task.done():
-        analysis_task.cancel()
-    return True  # Stop listening after cancel
-
-
-# Action handler registry
-ACTION_HANDLERS: Dict[str, ActionHandler] = {
-    "cancel": handle_cancel_action,
-}
+# Actions clients may send after the initial request
+SUPPORTED_ACTIONS = ["cancel"]
 
 
 async def listen_for_messages(
@@ -42,11 +21,11 @@ async def listen_for_messages(
     stock_ticker: Optional[str] = None
 ):
     """
-    Listen for incoming WebSocket messages and dispatch to appropriate handlers.
+    Listen for incoming WebSocket messages and handle client actions.
     
     This function runs concurrently with the analysis task and listens for
-    client messages. It uses a registry pattern to dispatch actions to their
-    respective handlers, making it easy to add new event types in the future.
+    client messages. Currently the only action is "cancel", which cancels
+    the analysis and stops listening.
     
     Args:
         websocket: WebSocket connection to receive messages from
@@ -54,39 +33,45 @@ async def listen_for_messages(
         stock_ticker: Stock ticker being analyzed (for logging)
     """
     try:
-        while True:
-            message = await websocket.receive_json()
-            action = message.get("action")
+        async for raw in websocket.iter_text():
+            try:
+                message = msgspec.json.decode(raw, type=ControlMessage)
+            except (msgspec.DecodeError, msgspec.ValidationError) as e:
+                logger.warning(f"Received invalid message: {e}")
+                continue
+            action = message.action
             
             if not action:
                 logger.warning("Received message without 'action' field")
                 continue
             
-            # Look up and execute the handler
-            handler = ACTION_HANDLERS.get(action)
+            if action == "cancel":
+                logger.info(f"Received cancel request for {stock_ticker or 'unknown'}")
+                if analysis_task and not analysis_task.done():
+                    analysis_task.cancel()
+                break  # Stop listening after cancel
             
-            if handler:
-                # Execute the handler and check if we should stop listening
-                should_stop = await handler(
-                    message, websocket, analysis_task, stock_ticker
-                )
-                if should_stop:
-                    break
-            else:
-                logger.warning(f"Unknown action received: {action}")
-                await websocket.send_json({
-                    "error": f"Unknown action: {action}",
-                    "available_actions": list(ACTION_HANDLERS.keys())
-                })
+            logger.warning(f"Unknown action received: {action}")
+            await send_orjson(websocket, {
+                "error": f"Unknown action: {action}",
+                "available_actions": SUPPORTED_ACTIONS
+            })
+        else:
+            # iter_text() ends cleanly when the client disconnects
+            logger.info("Client disconnected")
+            if analysis_task and not analysis_task.done():
+                analysis_task.cancel()
                 
-    except WebSocketDisconnect:
-        logger.info("Client disconnected")
-        if analysis_task and not analysis_task.done():
-            analysis_task.cancel()
     except Exception as e:
         logger.error(f"Error in message listener: {e}")
 
 
+def _stop_task(task: asyncio.Task):
+    """Cancel a task unless it has finished or is already being cancelled."""
+    if not task.done() and not task.cancelling():
+        task.cancel()
+
+
 async def websocket_endpoint(websocket: WebSocket):
     """
     WebSocket endpoint for real-time stock analysis with progress updates.
@@ -102,37 +87,30 @@ async def websocket_endpoint(websocket: WebSocket):
     
     try:
         # Receive initial request
-        data = await websocket.receive_json()
-        stock_ticker = data.get("stock_ticker")
-        llm_choice = data.get("llm_choice", "openai")
+        raw = await websocket.receive_text()
+        try:
+            data = msgspec.json.decode(raw, type=ControlMessage)
+        except (msgspec.DecodeError, msgspec.ValidationError) as e:
+            await send_orjson(websocket, {"error": f"Invalid request: {e}"})
+            return
+        stock_ticker = data.stock_ticker
+        llm_choice = data.llm_choice
         
         if not stock_ticker:
-            await websocket.send_json({"error": "No stock ticker provided"})
+            await send_orjson(websocket, {"error": "No stock ticker provided"})
             return
         
-        # Create analysis task
-        analysis_task = asyncio.create_task(
-            run_stock_analysis(websocket, stock_ticker, llm_choice)
-        )
-        
-        # Create task to listen for messages (including cancel and future actions)
-        listener_task = asyncio.create_task(
-            listen_for_messages(websocket, analysis_task, stock_ticker)
-        )
-        
-        # Wait for either analysis to complete or cancellation
-        done, pending = await asyncio.wait(
-            [analysis_task, listener_task],
-            return_when=asyncio.FIRST_COMPLETED
-        )
-        
-        # Cancel any pending tasks
-        for task in pending:
-            task.cancel()
-            try:
-                await task
-            except asyncio.CancelledError:
-                pass
+        # Run the analysis and the message listener (cancel and future
+        # actions) together; whichever finishes first stops the other
+        async with asyncio.TaskGroup() as tg:
+            analysis_task = tg.create_task(
+                run_stock_analysis(websocket, stock_ticker, llm_choice)
+            )
+            listener_task = tg.create_task(
+                listen_for_messages(websocket, analysis_task, stock_ticker)
+            )
+            analysis_task.add_done_callback(lambda _: _stop_task(listener_task))
+            listener_task.add_done_callback(lambda _: _stop_task(analysis_task))
 
     except WebSocketDisconnect:
         logger.info("Client disconnected from WebSocket")
@@ -142,9 +120,15 @@ async def websocket_endpoint(websocket: WebSocket):
                 await analysis_task
             except asyncio.CancelledError:
                 pass
+    except ExceptionGroup as eg:
+        logger.error(f"WebSocket task error: {eg.exceptions}", exc_info=True)
+        try:
+            await send_orjson(websocket, {"error": str(eg.exceptions[0])})
+        except Exception as send_error:
+            logger.debug("Could not send error message (connection likely closed): %s", send_error)
     except Exception as e:
         logger.error(f"WebSocket error: {e}", exc_info=True)
         try:
-            await websocket.send_json({"error": str(e)})
-        except:
-            pass
+            await send_orjson(websocket, {"error": str(e)})
+        except Exception as send_error:
+            logger.debug("Could not send error message (connection likely closed): %s", send_error)
@@ -1,3 +1,29 @@
-from .config import get_finnhub_client, CORS_ORIGINS
+from .env import get_env
+from .config import (
+    get_finnhub_api_key,
+    get_async_http_client,
+    close_async_http_client,
+    get_process_pool,
+    shutdown_process_pool,
+    CORS_ORIGINS,
+    CREW_POOL,
+    EXECUTOR,
+    FINNHUB_API_BASE_URL,
+    LLMChoice,
+    WEB_CONCURRENCY,
+)
 
-__all__ = ["get_finnhub_client", "CORS_ORIGINS"]
+__all__ = [
+    "get_env",
+    "get_finnhub_api_key",
+    "get_async_http_client",
+    "close_async_http_client",
+    "get_process_pool",
+    "shutdown_process_pool",
+    "CORS_ORIGINS",
+    "CREW_POOL",
+    "EXECUTOR",
+    "FINNHUB_API_BASE_URL",
+    "LLMChoice",
+    "WEB_CONCURRENCY",
+]
@@ -1,61 +1,136 @@
 """Configuration and initialization for the backend."""
 
 import os
-from dotenv import load_dotenv
-import finnhub
+from enum import StrEnum
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import httpx
 from stock_analyser.utils.logger import logger
 
-# Load environment variables
-load_dotenv()
+from .env import get_env
 
 # CORS Configuration
-CORS_ORIGINS = [
+CORS_ORIGINS = frozenset({
     "http://localhost",
     "http://localhost:3000",  # React frontend development server
-]
+})
+
+# Finnhub REST API base URL (used by the async HTTP client)
+FINNHUB_API_BASE_URL = "https://finnhub.io/api/v1"
+
+# Shared async HTTP client, created lazily on first use
+_async_http_client: httpx.AsyncClient | None = None
+
+# Bounded thread pool for blocking work (crew kickoff, sync SDK calls).
+# Installed as the event loop's default executor on startup.
+EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("THREAD_POOL_SIZE", "8")),
+    thread_name_prefix="analysis",
+)
+
+# Web workers only do I/O, but each one owns its own crew process pool, so
+# the total number of crew processes is WEB_CONCURRENCY * CREW_POOL. Keep
+# the web workers few and size the pools from the CPU count here, so adding
+# workers splits the cores instead of multiplying the processes.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+CREW_POOL = int(os.getenv("CREW_POOL", max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)))
+
+# Dedicated process pool for crew runs, separate from EXECUTOR so analyses
+# never compete with other blocking calls; created lazily on first use
+_process_pool: ProcessPoolExecutor | None = None
+
+class LLMChoice(StrEnum):
+    """LLM providers selectable from the frontend."""
+    OPENAI = "openai"
+    ANTHROPIC = "anthropic"
+    GOOGLE = "google"
+    GEMINI = "gemini"  # the frontend's name for the Google provider
+
 
 # LLM Model Mapping
-# Maps frontend LLM choice to actual model names that CrewAI expects
+# Maps frontend LLM choice to actual model names that CrewAI expects.
+# Keys are StrEnum members, so plain (already lowercased) strings hash to
+# the same entries.
 LLM_MODEL_MAPPING = {
-    "openai": "openai/gpt-4o",        
-    "anthropic": "anthropic/claude-sonnet-4-5-20250929",  
-    "google": "gemini/gemini-2.5-pro",  
+    LLMChoice.OPENAI: "openai/gpt-4o",
+    LLMChoice.ANTHROPIC: "anthropic/claude-sonnet-4-5-20250929",
+    LLMChoice.GOOGLE: "gemini/gemini-2.5-pro",
+    LLMChoice.GEMINI: "gemini/gemini-2.5-pro",
 }
 
-
 def get_llm_model(llm_choice: str) -> str:
     """
     Get the actual model name from the LLM choice.
     
     Args:
-        llm_choice: The LLM provider choice (e.g., "openai", "anthropic", "google")
+        llm_choice: The lowercased LLM provider choice (e.g., "openai",
+            "anthropic", "google"); request models normalize it on decode
     
     Returns:
         The actual model name to use with CrewAI
     """
-    model = LLM_MODEL_MAPPING.get(llm_choice.lower())
+    model = LLM_MODEL_MAPPING.get(llm_choice)
     if not model:
         logger.warning(f"Unknown LLM choice '{llm_choice}', defaulting to OpenAI")
-        model = LLM_MODEL_MAPPING["openai"]
+        model = LLM_MODEL_MAPPING[LLMChoice.OPENAI]
     
     logger.info(f"LLM choice '{llm_choice}' mapped to model '{model}'")
     return model
 
 
-def get_finnhub_client():
+def get_finnhub_api_key() -> str | None:
+    """Return the Finnhub API key from the environment, if set."""
+    return get_env()["FINNHUB_API_KEY"]
+
+
+def get_process_pool() -> ProcessPoolExecutor:
     """
-    Initialize and return Finnhub client for ticker validation.
-    Returns None if initialization fails.
+    Return the process pool used to run crew analyses.
+
+    Crew runs do CPU work (response parsing, pandas/TA-Lib indicators) that
+    would otherwise contend for the GIL with the web worker.
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            # One process per concurrent analysis (see CREW_POOL)
+            max_workers=CREW_POOL
+        )
+        logger.info("Analysis process pool initialized")
+    return _process_pool
+
+
+def shutdown_process_pool():
+    """Shut down the analysis process pool if it was created."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+        logger.info("Analysis process pool shut down")
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared async HTTP client.
+
+    The client is created on first use and reused for all requests so
+    connections to upstream APIs are pooled, kept alive and multiplexed
+    over HTTP/2.
     """
-    try:
-        api_key = os.getenv("FINNHUB_API_KEY")
-        if api_key:
-            client = finnhub.Client(api_key=api_key)
-            logger.info("Finnhub client initialized for ticker validation")
-            return client
-        else:
-            logger.warning("FINNHUB_API_KEY not found in environment")
-            return None
-    except Exception as e:
-        logger.warning(f"Could not initialize Finnhub client: {e}")
-        return None
+    global _async_http_client
+    if _async_http_client is None:
+        _async_http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(5.0, connect=2.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=32),
+        )
+        logger.info("Async HTTP client initialized")
+    return _async_http_client
+
+
+async def close_async_http_client():
+    """Close the shared async HTTP client if it was created."""
+    global _async_http_client
+    if _async_http_client is not None:
+        await _async_http_client.aclose()
+        _async_http_client = None
+        logger.info("Async HTTP client closed")
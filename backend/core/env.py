@@ -0,0 +1,26 @@
+"""Environment loading for the backend."""
+
+import os
+from functools import lru_cache
+from typing import Any
+
+from dotenv import load_dotenv
+
+
+@lru_cache(maxsize=1)
+def get_env() -> dict[str, Any]:
+    """
+    Load `.env` once and return the settings read on the request path.
+
+    The result is cached, so `.env` is parsed a single time per process and
+    later lookups are plain dict reads.
+    """
+    load_dotenv()
+    return {
+        "FINNHUB_API_KEY": os.environ.get("FINNHUB_API_KEY"),
+        "TEST_MODE": os.environ.get("TEST_MODE", "false").lower() == "true",
+    }
+
+
+# Load environment variables at import time
+get_env()
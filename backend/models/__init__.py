@@ -1,3 +1,3 @@
-from .requests import TickerValidationRequest
+from .requests import ControlMessage, TickerValidationRequest, parse_ticker_request
 
-__all__ = ["TickerValidationRequest"]
+__all__ = ["ControlMessage", "TickerValidationRequest", "parse_ticker_request"]
@@ -1,8 +1,44 @@
 """Request models for the API."""
 
-from pydantic import BaseModel
+import msgspec
+from fastapi import HTTPException, Request
 
 
-class TickerValidationRequest(BaseModel):
-    """Request model for ticker validation."""
+class TickerValidationRequest(msgspec.Struct, forbid_unknown_fields=True, gc=False):
+    """Request model for ticker validation. The ticker is normalized on decode."""
     ticker: str
+
+    def __post_init__(self):
+        self.ticker = self.ticker.strip().upper()
+
+
+class ControlMessage(msgspec.Struct):
+    """
+    Message received over the analysis WebSocket.
+
+    The first message starts an analysis (`stock_ticker`, `llm_choice`);
+    later messages carry an `action` such as "cancel". A missing or null
+    `llm_choice` falls back to "openai".
+    """
+    stock_ticker: str | None = None
+    llm_choice: str | None = None
+    action: str | None = None
+
+    def __post_init__(self):
+        # Normalize once here so get_llm_model can do a plain dict lookup
+        self.llm_choice = (self.llm_choice or "openai").lower()
+
+
+async def parse_ticker_request(request: Request) -> TickerValidationRequest:
+    """
+    Decode and validate a ticker validation request body with msgspec.
+
+    Raises:
+        HTTPException: 422 if the body is not a valid TickerValidationRequest
+    """
+    try:
+        return msgspec.json.decode(await request.body(), type=TickerValidationRequest)
+    except msgspec.ValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid JSON: {e}")
@@ -1,3 +1,4 @@
 from .stock_analysis import run_stock_analysis
+from .websocket_writer import WebSocketWriter, send_orjson
 
-__all__ = ["run_stock_analysis"]
+__all__ = ["run_stock_analysis", "WebSocketWriter", "send_orjson"]
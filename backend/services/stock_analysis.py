@@ -1,21 +1,143 @@
 """Stock analysis service for running analysis tasks."""
 
 import asyncio
-import os
+import time
 from datetime import datetime
-from dotenv import load_dotenv
+from functools import lru_cache
+
 from fastapi import WebSocket
 
-from stock_analyser.crew import StockAnalyser
-from stock_analyser.utils.logger import logger
-from backend.core.config import get_finnhub_client, get_llm_model
+from stock_analyser.utils.cache import TTLCache
+from stock_analyser.utils.logger import bind_log_context, bind_process_log_context, logger
+from stock_analyser.utils.paths import get_report_path
+from backend.core.config import get_llm_model, get_process_pool
+from backend.core.env import get_env
+from .websocket_writer import WebSocketWriter
 
 # Check if in test mode
-TEST_MODE = os.getenv("TEST_MODE", "false").lower() == "true"
+TEST_MODE = get_env()["TEST_MODE"]
 
 if TEST_MODE:
     logger.info("TEST_MODE enabled - will use TestCrew when analysis starts")
 
+# Size of each report chunk streamed over the WebSocket
+REPORT_CHUNK_SIZE = 16384
+
+# Crew runs currently executing, keyed by (llm_model, stock_name). Concurrent
+# requests for the same key share one run instead of starting a duplicate.
+_in_flight: dict[tuple[str, str], asyncio.Future] = {}
+
+# Recently generated reports, keyed like _in_flight. A repeat request within
+# the TTL is answered without re-running the crew; failed runs are not cached.
+REPORT_CACHE_TTL = 900
+_report_cache = TTLCache(maxsize=256, ttl=REPORT_CACHE_TTL)
+
+# Static parts of the progress updates; only the ticker is filled in per run
+_INITIALIZING = {"status": "initializing", "message": "Initializing stock analysis...", "progress": 0}
+_RESEARCHING = {"status": "researching", "progress": 10}
+_TECHNICAL_ANALYSIS = {"status": "analyzing", "message": "Running technical analysis...", "progress": 30}
+_SENTIMENT_ANALYSIS = {"status": "analyzing", "message": "Performing sentiment analysis...", "progress": 50}
+_GENERATING_REPORT = {"status": "generating_report", "message": "Generating final report...", "progress": 80}
+
+
+@lru_cache(maxsize=1)
+def _year_for_hour(hour: int) -> str:
+    return str(datetime.now().year)
+
+
+def _current_year() -> str:
+    """Current year as a string, recomputed at most once an hour."""
+    return _year_for_hour(int(time.time() // 3600))
+
+
+@lru_cache(maxsize=8)
+def _get_crew(llm_model: str):
+    """
+    Build the crew (test or production) for a model.
+
+    The ticker is passed to kickoff() through `inputs`, so one crew per model
+    is cached per worker process and reused across tickers, skipping agent,
+    task, tool and LLM client setup. A worker runs one job at a time, so a
+    cached crew is never kicked off concurrently.
+    """
+    if TEST_MODE:
+        # Lazy import - only import when needed
+        from backend.test_crew import TestCrew
+        logger.info(f"Creating TestCrew for {llm_model}")
+        return TestCrew(llm_model).crew()
+
+    # Lazy import - CrewAI and the tool SDKs are only loaded once a crew is needed
+    from stock_analyser.crew import StockAnalyser
+    logger.info(f"Creating StockAnalyser for {llm_model}")
+    return StockAnalyser(llm_model).crew()
+
+
+def _run_crew(llm_model: str, inputs: dict, log_context: dict) -> str:
+    """
+    Run the crew in a worker process and return the report markdown.
+
+    Top-level so it can be pickled for the process pool; only plain strings
+    cross the process boundary. Context variables don't either, so the
+    caller's log fields are passed in `log_context` and bound here.
+    """
+    bind_process_log_context(**log_context)
+    result = _get_crew(llm_model).kickoff(inputs=inputs)
+    return getattr(result, "raw", None) or str(result or "")
+
+
+async def _analyze(llm_model: str, stock_name: str, inputs: dict, log_context: dict) -> str:
+    """
+    Run the crew in the process pool, joining an identical in-flight run.
+
+    A fresh cached report is returned without running the crew. The shared
+    run is shielded so one subscriber cancelling does not affect the others.
+    """
+    key = (llm_model, stock_name)
+    cached = _report_cache.get(key)
+    if cached is not None:
+        logger.info(f"Serving cached report for {stock_name} ({llm_model})")
+        return cached
+
+    future = _in_flight.get(key)
+    if future is None:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(get_process_pool(), _run_crew, llm_model, inputs, log_context)
+        _in_flight[key] = future
+
+        def _release(done: asyncio.Future):
+            if _in_flight.get(key) is done:
+                del _in_flight[key]
+            if not done.cancelled() and done.exception() is None and done.result():
+                _report_cache.set(key, done.result())
+
+        future.add_done_callback(_release)
+    else:
+        logger.info(f"Joining in-flight analysis for {stock_name} ({llm_model})")
+    return await asyncio.shield(future)
+
+
+async def stream_report(writer: WebSocketWriter, stock_ticker: str, report_content: str):
+    """
+    Stream a report to the client in fixed-size chunks.
+
+    Sends a `report_ready` frame with the report size, followed by numbered
+    `streaming_report` frames. The caller sends the final `completed` frame.
+    """
+    await writer.send({
+        "stock_ticker": stock_ticker,
+        "status": "report_ready",
+        "message": "Sending report...",
+        "progress": 90,
+        "size": len(report_content)
+    })
+
+    for seq, start in enumerate(range(0, len(report_content), REPORT_CHUNK_SIZE)):
+        await writer.send({
+            "status": "streaming_report",
+            "seq": seq,
+            "chunk": report_content[start:start + REPORT_CHUNK_SIZE]
+        })
+
 
 async def run_stock_analysis(
     websocket: WebSocket,
@@ -30,130 +152,95 @@ async def run_stock_analysis(
         stock_ticker: Stock ticker symbol to analyze
         llm_choice: LLM provider choice (openai, anthropic, gemini)
     """
-    try:
-        # Send initial status
-        await websocket.send_json({
-            "stock_ticker": stock_ticker,
-            "llm_choice": llm_choice,
-            "status": "initializing",
-            "message": "Initializing stock analysis...",
-            "progress": 0
-        })
-        
-        # Load environment variables
-        load_dotenv()
-        
-        # Send status for data gathering phase
-        await websocket.send_json({
-            "stock_ticker": stock_ticker,
-            "status": "researching",
-            "message": f"Gathering data for {stock_ticker}...",
-            "progress": 10
-        })
-        
-        # Create inputs for the crew
-        inputs = {
-            'name': stock_ticker,
-            'current_year': str(datetime.now().year)
-        }
-        
-        # Send status for analysis phase
-        await websocket.send_json({
-            "stock_ticker": stock_ticker,
-            "status": "analyzing",
-            "message": "Running technical analysis...",
-            "progress": 30
-        })
-        
-        # Run the analysis in a thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        
-        # Map LLM choice to actual model name
-        llm_model = get_llm_model(llm_choice)
-        
-        # Create the crew (test or production)
-        if TEST_MODE:
-            # Lazy import - only import when needed
-            from backend.test_crew import TestCrew
-            logger.info(f"Creating TestCrew for {stock_ticker}")
-            stock_crew = TestCrew(llm_model)
-        else:
-            logger.info(f"Creating StockAnalyser for {stock_ticker}")
-            stock_crew = StockAnalyser(llm_model, stock_name=inputs['name'])
-        
-        # Send status for sentiment analysis
-        await websocket.send_json({
-            "stock_ticker": stock_ticker,
-            "status": "analyzing",
-            "message": "Performing sentiment analysis...",
-            "progress": 50
-        })
-        
-        # Run the crew kickoff in a thread pool
-        # Note: Thread pool tasks cannot be cancelled directly via task.cancel()
-        # Cancellation will occur at the next await point after this executor completes
-        result = await loop.run_in_executor(
-            None,
-            lambda: stock_crew.crew().kickoff(inputs=inputs)
-        )
-        
-        # Send status for report generation
-        await websocket.send_json({
-            "stock_ticker": stock_ticker,
-            "status": "generating_report",
-            "message": "Generating final report...",
-            "progress": 80
-        })
-        
-        # Get the report content
-        if TEST_MODE:
-            # In test mode, use the crew result directly
-            report_content = f"""
+    # Runs as its own task, so the bound fields only tag this analysis's logs;
+    # the crew process binds the same fields for its own logs
+    log_context = {"ticker": stock_ticker, "llm": llm_choice}
+    bind_log_context(**log_context)
+    async with WebSocketWriter(websocket) as writer:
+        try:
+            # Send initial status
+            writer.emit({**_INITIALIZING, "stock_ticker": stock_ticker, "llm_choice": llm_choice})
+            
+            # Send status for data gathering phase
+            writer.emit({
+                **_RESEARCHING,
+                "stock_ticker": stock_ticker,
+                "message": f"Gathering data for {stock_ticker}..."
+            })
+            
+            # Create inputs for the crew
+            inputs = {
+                'name': stock_ticker,
+                'current_year': _current_year()
+            }
+            
+            # Send status for analysis phase
+            writer.emit({**_TECHNICAL_ANALYSIS, "stock_ticker": stock_ticker})
+            
+            # Map LLM choice to actual model name
+            llm_model = get_llm_model(llm_choice)
+            
+            # Send status for sentiment analysis
+            writer.emit({**_SENTIMENT_ANALYSIS, "stock_ticker": stock_ticker})
+            
+            # Run the crew in the process pool to keep CPU work off this worker
+            # Note: Pool jobs cannot be cancelled directly via task.cancel();
+            # cancelling only stops this request from waiting on the result
+            result = await _analyze(llm_model, inputs['name'], inputs, log_context)
+            
+            # Send status for report generation
+            writer.emit({**_GENERATING_REPORT, "stock_ticker": stock_ticker})
+            
+            # Get the report content
+            if TEST_MODE:
+                # In test mode, use the crew result directly
+                report_content = f"""
                 # Test Mode Stock Analysis Report
                 ## Ticker: {stock_ticker}
                 ## LLM: {llm_model}
                 ### Test Result: {str(result)}
             """
-            report_path = None  # No file saved in test mode
-        else:
-            # In production mode, read the generated report file
-            safe_model = llm_model.replace("/", "_")
-            report_path = f'output/{stock_ticker}_{safe_model}_report.md'
-            try:
-                with open(report_path, 'r') as f:
-                    report_content = f.read()
-            except FileNotFoundError:
-                report_content = "Report file not found. Analysis may have encountered an issue."
-        
-        # Send completion status with the report
-        await websocket.send_json({
-            "stock_ticker": stock_ticker,
-            "llm_choice": llm_choice,
-            "status": "completed",
-            "message": "Analysis complete!",
-            "progress": 100,
-            "report": report_content,
-            "report_path": report_path
-        })
-        
-        logger.info(f"Successfully completed analysis for {stock_ticker}")
-        
-    except asyncio.CancelledError:
-        logger.info(f"Analysis cancelled for {stock_ticker}")
-        try:
-            await websocket.send_json({
+                report_path = None  # No file saved in test mode
+            else:
+                # In production mode, stream the final task output from memory;
+                # the report file is still written by the crew for archival
+                report_path = str(get_report_path(stock_ticker, llm_model))
+                report_content = result
+                if report_content:
+                    await stream_report(writer, stock_ticker, report_content)
+                    report_content = None  # Already streamed in chunks
+                else:
+                    report_content = "Report not available. Analysis may have encountered an issue."
+            
+            # Send completion status (with the report if it wasn't streamed)
+            await writer.send({
                 "stock_ticker": stock_ticker,
-                "status": "cancelled",
-                "message": "Analysis was cancelled",
-                "progress": 0
+                "llm_choice": llm_choice,
+                "status": "completed",
+                "message": "Analysis complete!",
+                "progress": 100,
+                "report": report_content,
+                "report_path": report_path
             })
+            
+            logger.info("Successfully completed analysis")
+            
+        except asyncio.CancelledError:
+            logger.info("Analysis cancelled")
+            try:
+                await writer.send({
+                    "stock_ticker": stock_ticker,
+                    "status": "cancelled",
+                    "message": "Analysis was cancelled",
+                    "progress": 0
+                })
+            except Exception as e:
+                logger.debug("Could not send cancellation message (connection likely closed): %s", e)
         except Exception as e:
-            logger.debug(f"Could not send cancellation message (connection likely closed): {e}")
-    except Exception as e:
-        logger.error(f"Error during stock analysis: {e}", exc_info=True)
-        await websocket.send_json({
-            "stock_ticker": stock_ticker,
-            "status": "error",
-            "message": f"An error occurred: {str(e)}",
-            "error": str(e)
-        })
+            logger.error(f"Error during stock analysis: {e}", exc_info=True)
+            await writer.send({
+                "stock_ticker": stock_ticker,
+                "status": "error",
+                "message": f"An error occurred: {str(e)}",
+                "error": str(e)
+            })
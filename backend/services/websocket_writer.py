@@ -0,0 +1,120 @@
+"""Backpressure-aware writer for outgoing WebSocket messages."""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import WebSocket
+
+from stock_analyser.utils.logger import logger
+
+# Maximum number of messages buffered before producers block (or drop)
+DEFAULT_QUEUE_SIZE = 32
+
+# Progress updates emitted within this window (seconds) are merged into one frame
+COALESCE_INTERVAL = 0.05
+
+# Maximum number of queued messages shipped together in one batch frame
+MAX_BATCH_SIZE = 16
+
+
+async def send_orjson(websocket: WebSocket, message: Dict[str, Any]):
+    """Serialize a message with orjson and send it as a binary frame."""
+    await websocket.send_bytes(orjson.dumps(message))
+
+
+class WebSocketWriter:
+    """
+    Bounded outgoing message queue drained by a single writer task.
+
+    Producers enqueue messages instead of writing to the socket directly, so
+    a slow client pushes back on the analysis instead of growing send buffers
+    without bound. Progress updates are coalesced: updates emitted within
+    `COALESCE_INTERVAL` are merged into one frame, identical consecutive
+    frames are skipped, and they are dropped if the queue is full. Everything
+    else waits for space and flushes any pending progress first, so ordering
+    is preserved. Messages already queued when the writer wakes up are sent
+    together as one `{"type": "batch", "events": [...]}` frame.
+
+    Use as an async context manager: the writer task starts on enter, and on
+    exit all queued messages are flushed before the task is stopped.
+    """
+
+    def __init__(self, websocket: WebSocket, maxsize: int = DEFAULT_QUEUE_SIZE):
+        self.websocket = websocket
+        self._queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=maxsize)
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[Exception] = None
+        self._pending: Optional[Dict[str, Any]] = None
+        self._last_progress: Optional[Dict[str, Any]] = None
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    async def __aenter__(self) -> "WebSocketWriter":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            self._flush_pending()
+            await self._queue.join()
+        finally:
+            if self._task:
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+
+    async def _run(self):
+        """Send queued messages in order until cancelled."""
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < MAX_BATCH_SIZE and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                # After a failed send the connection is gone; just drain
+                if self._error is None:
+                    if len(batch) == 1:
+                        await send_orjson(self.websocket, batch[0])
+                    else:
+                        await send_orjson(self.websocket, {"type": "batch", "events": batch})
+            except Exception as e:
+                self._error = e
+                logger.debug("WebSocket send failed (connection likely closed): %s", e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _flush_pending(self):
+        """Move the merged pending progress update onto the queue."""
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        message, self._pending = self._pending, None
+        if message is None or message == self._last_progress:
+            return
+        try:
+            self._queue.put_nowait(message)
+            self._last_progress = message
+        except asyncio.QueueFull:
+            logger.debug("Dropping progress update '%s' (slow client)", message.get('status'))
+
+    def emit(self, message: Dict[str, Any]):
+        """
+        Buffer a droppable progress update without waiting.
+
+        Updates emitted before the next flush are merged, with later values
+        taking precedence.
+        """
+        if self._pending is None:
+            self._pending = dict(message)
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                COALESCE_INTERVAL, self._flush_pending
+            )
+        else:
+            self._pending.update(message)
+
+    async def send(self, message: Dict[str, Any]):
+        """Queue a message that must be delivered, waiting for space if needed."""
+        self._flush_pending()
+        await self._queue.put(message)
@@ -1,13 +1,29 @@
 """Simple test crew for end-to-end testing without expensive operations."""
 
+from typing import Any
+
 from crewai import Agent, Crew, Task, Process
+from crewai.llms.base_llm import BaseLLM
+
+
+class FakeLLM(BaseLLM):
+    """LLM stub that answers immediately with a fixed reply, for offline runs."""
+
+    def __init__(self, reply: str = "Hello! The system is working."):
+        super().__init__(model="fake")
+        self.reply = reply
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None) -> Any:
+        # Phrased as a final answer so the agent stops after one turn
+        return f"Thought: I now know the final answer\nFinal Answer: {self.reply}"
 
 
 class TestCrew:
     """Minimal crew for testing WebSocket flow without expensive operations."""
     
-    def __init__(self, llm_choice: str = "openai"):
-        """Initialize test crew with specified LLM."""
+    def __init__(self, llm_choice: str = "fake"):
+        """Initialize test crew with specified LLM ("fake" needs no API access)."""
         self.llm_choice = llm_choice
     
     def crew(self) -> Crew:
@@ -20,7 +36,9 @@ class TestCrew:
             backstory="A friendly test agent for system testing",
             verbose=False,
             allow_delegation=False,
-            llm=self.llm_choice
+            llm=FakeLLM() if self.llm_choice == "fake" else self.llm_choice,
+            cache=True,
+            max_iter=1
         )
         
         # Simple test task
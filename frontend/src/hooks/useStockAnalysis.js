@@ -11,6 +11,7 @@ export const useStockAnalysis = ({ ticker, llmProvider }) => {
   const [isCancelling, setIsCancelling] = useState(false);
   
   const wsRef = useRef(null);
+  const reportChunksRef = useRef([]);
 
   // Cleanup WebSocket on unmount
   useEffect(() => {
@@ -32,12 +33,19 @@ export const useStockAnalysis = ({ ticker, llmProvider }) => {
       return;
     }
 
+    // Report chunks are buffered until the completion frame arrives
+    if (data.status === 'streaming_report') {
+      reportChunksRef.current[data.seq] = data.chunk;
+      return;
+    }
+
     if (data.status) {
       setStatusMessage(data.message || '');
       setProgress(data.progress || 0);
 
       if (data.status === 'completed') {
-        setReport(data.report || '');
+        setReport(data.report ?? reportChunksRef.current.join(''));
+        reportChunksRef.current = [];
         setIsAnalyzing(false);
         if (wsRef.current) {
           wsRef.current.close();
@@ -100,6 +108,7 @@ export const useStockAnalysis = ({ ticker, llmProvider }) => {
     // Reset states
     setError('');
     setReport('');
+    reportChunksRef.current = [];
     setProgress(0);
     setStatusMessage('Connecting to server...');
     setIsAnalyzing(true);
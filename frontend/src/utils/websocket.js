@@ -11,6 +11,9 @@ export const createAnalysisWebSocket = ({
 }) => {
   const wsUrl = `${WS_BASE_URL}${WS_ENDPOINTS.REPORT}`;
   const ws = new WebSocket(wsUrl);
+  // The server sends JSON as binary frames
+  ws.binaryType = 'arraybuffer';
+  const decoder = new TextDecoder();
   
   ws.onopen = () => {
     console.log('WebSocket connected');
@@ -30,11 +33,17 @@ export const createAnalysisWebSocket = ({
   
   ws.onmessage = (event) => {
     try {
-      const data = JSON.parse(event.data);
+      const text = typeof event.data === 'string' ? event.data : decoder.decode(event.data);
+      const data = JSON.parse(text);
       console.log('Received WebSocket message:', data);
       
       if (onMessage) {
-        onMessage(data);
+        // The server may ship several queued messages in one batch frame
+        if (data.type === 'batch') {
+          data.events.forEach(onMessage);
+        } else {
+          onMessage(data);
+        }
       }
     } catch (error) {
       console.error('Error parsing WebSocket message:', error);
@@ -1,15 +1,41 @@
+import copy
 import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+import yaml
 
 from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
+from crewai.project import CrewBase, agent, before_kickoff, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from typing import List
-from crewai_tools import SerperDevTool
-from .tools.finnhub_tools import get_finnhub_tools
+from .tools.search_tools import CachedSerperDevTool
+from .tools.finnhub_tools import get_finnhub_tools, prewarm as prewarm_finnhub
 from .tools.alpha_vantage_tools import get_alpha_vantage_tools
 from .tools.visualization_tools import VisualizationTools
 from .tools.technical_analysis_tools import get_technical_analysis_tools
 from .utils.logger import logger
+from .utils.paths import ensure_output_dir, get_report_path
+
+
+@lru_cache(maxsize=None)
+def _parse_yaml(config_path: str) -> dict:
+    with open(config_path, encoding="utf-8") as file:
+        content = yaml.safe_load(file)
+    return content if isinstance(content, dict) else {}
+
+
+def _load_yaml(config_path: Path) -> dict:
+    """
+    Parse a crew config file once per process.
+
+    CrewBase re-reads agents.yaml and tasks.yaml for every instance, and
+    then fills in llm/tools references in place, so each caller gets its
+    own deep copy of the cached parse.
+    """
+    return copy.deepcopy(_parse_yaml(str(config_path)))
+
 
 @CrewBase
 class StockAnalyser():
@@ -20,97 +46,115 @@ class StockAnalyser():
 
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
-    serper_dev_tool = SerperDevTool()
-    finnhub_tools = None
-    alpha_vantage_tools = None
-    try:
-        finnhub_tools = get_finnhub_tools()
-        logger.info("Finnhub tools initialized successfully.")
-    except ValueError as e:
-        logger.error(f"Error initializing Finnhub tools: {e}", exc_info=True)
-    try:
-        alpha_vantage_tools = get_alpha_vantage_tools()
-        logger.info("Alpha Vantage tools initialized successfully.")
-    except ValueError as e:
-        logger.error(f"Error initializing Alpha Vantage tools: {e}", exc_info=True)
-    visualization_tools = VisualizationTools()
-    technical_analysis_tools = get_technical_analysis_tools()
-
-    def __init__(self, selected_llm_type: str, stock_name: str):
+
+    # Tools are shared by all instances but built lazily on first use, so
+    # importing this module (or running TestCrew) does no provider setup.
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _serper():
+        try:
+            return CachedSerperDevTool()
+        except Exception as e:
+            logger.error(f"Error initializing Serper tool: {e}", exc_info=True)
+            return None
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _finnhub_tools():
+        try:
+            tools = get_finnhub_tools()
+            logger.info("Finnhub tools initialized successfully.")
+            return tools
+        except ValueError as e:
+            logger.error(f"Error initializing Finnhub tools: {e}", exc_info=True)
+            return None
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _alpha_vantage_tools():
+        try:
+            tools = get_alpha_vantage_tools()
+            logger.info("Alpha Vantage tools initialized successfully.")
+            return tools
+        except ValueError as e:
+            logger.error(f"Error initializing Alpha Vantage tools: {e}", exc_info=True)
+            return None
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _visualization_tools():
+        try:
+            return VisualizationTools()
+        except Exception as e:
+            logger.error(f"Error initializing Visualization tools: {e}", exc_info=True)
+            return None
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _technical_analysis_tools():
+        try:
+            return get_technical_analysis_tools()
+        except Exception as e:
+            logger.error(f"Error initializing Technical Analysis tools: {e}", exc_info=True)
+            return None
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _data_tools() -> tuple:
+        """Finnhub and Alpha Vantage tools, which every agent gets."""
+        return (
+            *(StockAnalyser._finnhub_tools() or ()),
+            *(StockAnalyser._alpha_vantage_tools() or ()),
+        )
+
+    def __init__(self, selected_llm_type: str, stock_name: str | None = None):
+        # The ticker is supplied per run through kickoff(inputs={'name': ...}),
+        # so one instance can be reused across tickers.
         self.selected_llm_type = selected_llm_type
         self.stock_name = stock_name
+        # Step-by-step agent output and tracing cost serialization on every
+        # step, so they are opt-in (read here, after load_dotenv has run)
+        self.verbose = os.getenv("CREW_VERBOSE", "0") == "1"
         logger.info(f"StockAnalyser initialized with LLM type: {selected_llm_type}")
-        os.makedirs("output", exist_ok=True)
-
-    @agent
-    def researcher(self) -> Agent:
-        researcher_tools = [self.serper_dev_tool]
-        if self.finnhub_tools:
-            researcher_tools.extend(self.finnhub_tools)
-        if self.alpha_vantage_tools:
-            researcher_tools.extend(self.alpha_vantage_tools)
+        ensure_output_dir()
+
+    @before_kickoff
+    def prewarm_data(self, inputs):
+        """Start filling the Finnhub cache for the ticker while the crew spins up."""
+        if inputs and inputs.get('name'):
+            threading.Thread(
+                target=prewarm_finnhub, args=([inputs['name']],), name="finnhub-prewarm", daemon=True
+            ).start()
+        return inputs
+
+    def _make_agent(self, config_key: str, tools: list) -> Agent:
+        """Build an agent from its YAML config with the selected LLM."""
         return Agent(
-            config=self.agents_config['researcher'], # type: ignore[index]
+            config=self.agents_config[config_key], # type: ignore[index]
             llm=self.selected_llm_type,
-            tools=researcher_tools,
-            verbose=True
+            tools=[t for t in (*tools, *self._data_tools()) if t is not None],
+            verbose=self.verbose
         )
 
+    @agent
+    def researcher(self) -> Agent:
+        return self._make_agent('researcher', [self._serper()])
+
     @agent
     def reporter(self) -> Agent:
-        reporter_tools = [self.serper_dev_tool, self.visualization_tools]
-        if self.finnhub_tools:
-            reporter_tools.extend(self.finnhub_tools)
-        if self.alpha_vantage_tools:
-            reporter_tools.extend(self.alpha_vantage_tools)
-        return Agent(
-            config=self.agents_config['reporter'], # type: ignore[index]
-            llm=self.selected_llm_type,
-            tools=reporter_tools,
-            verbose=True
-        )
+        return self._make_agent('reporter', [self._serper(), self._visualization_tools()])
 
     @agent
     def technical_analyst(self) -> Agent:
-        technical_analyst_tools = list(self.technical_analysis_tools)
-        if self.finnhub_tools:
-            technical_analyst_tools.extend(self.finnhub_tools)
-        if self.alpha_vantage_tools:
-            technical_analyst_tools.extend(self.alpha_vantage_tools)
-        return Agent(
-            config=self.agents_config['technical_analyst'], # type: ignore[index]
-            llm=self.selected_llm_type,
-            tools=technical_analyst_tools,
-            verbose=True
-        )
+        return self._make_agent('technical_analyst', list(self._technical_analysis_tools() or []))
 
     @agent
     def fundamental_analyst(self) -> Agent:
-        fundamental_analyst_tools = [self.serper_dev_tool]
-        if self.finnhub_tools:
-            fundamental_analyst_tools.extend(self.finnhub_tools)
-        if self.alpha_vantage_tools:
-            fundamental_analyst_tools.extend(self.alpha_vantage_tools)
-        return Agent(
-            config=self.agents_config['fundamental_analyst'], # type: ignore[index]
-            llm=self.selected_llm_type,
-            tools=fundamental_analyst_tools,
-            verbose=True
-        )
+        return self._make_agent('fundamental_analyst', [self._serper()])
 
     @agent
     def sentiment_analyst(self) -> Agent:
-        sentiment_analyst_tools = [self.serper_dev_tool]
-        if self.finnhub_tools:
-            sentiment_analyst_tools.extend(self.finnhub_tools)
-        if self.alpha_vantage_tools:
-            sentiment_analyst_tools.extend(self.alpha_vantage_tools)
-        return Agent(
-            config=self.agents_config['sentiment_analyst'], # type: ignore[index]
-            llm=self.selected_llm_type,
-            tools=sentiment_analyst_tools,
-            verbose=True
-        )
+        return self._make_agent('sentiment_analyst', [self._serper()])
 
     @task
     def researcher_task(self) -> Task:
@@ -119,17 +163,18 @@ class StockAnalyser():
             description=task_config['description'],
             expected_output=task_config['expected_output'],
             agent=self.researcher(),
+            async_execution=True,
         )
 
     @task
     def reporter_task(self) -> Task:
         task_config = self.tasks_config['reporter_task']
-        safe_model = self.selected_llm_type.replace("/", "_")
         return Task(
             description=task_config['description'],
             expected_output=task_config['expected_output'],
             context=[self.researcher_task(), self.sentiment_analysis_task(), self.technical_analyst_task(), self.chart_pattern_analysis_task(), self.fundamental_analysis_task()],
-            output_file=f'output/{self.stock_name}_{safe_model}_report.md',
+            # {name} is filled from the kickoff inputs
+            output_file=str(get_report_path("{name}", self.selected_llm_type)),
             markdown=task_config['markdown'],
             agent=self.reporter()
         )
@@ -140,7 +185,8 @@ class StockAnalyser():
         return Task(
             description=task_config['description'],
             expected_output=task_config['expected_output'],
-            agent=self.technical_analyst()
+            agent=self.technical_analyst(),
+            async_execution=True,
         )
 
     @task
@@ -149,7 +195,9 @@ class StockAnalyser():
         return Task(
             description=task_config['description'],
             expected_output=task_config['expected_output'],
-            agent=self.technical_analyst()
+            context=[self.technical_analyst_task()],
+            agent=self.technical_analyst(),
+            async_execution=True,
         )
 
     @task
@@ -158,7 +206,8 @@ class StockAnalyser():
         return Task(
             description=task_config['description'],
             expected_output=task_config['expected_output'],
-            agent=self.sentiment_analyst()
+            agent=self.sentiment_analyst(),
+            async_execution=True,
         )
 
     @task
@@ -176,8 +225,24 @@ class StockAnalyser():
         """Creates the StockAnnalyzer crew"""
         return Crew(
             agents=[self.researcher(), self.reporter(), self.technical_analyst(), self.sentiment_analyst(), self.fundamental_analyst()],
-            tasks=[self.researcher_task(), self.sentiment_analysis_task(), self.technical_analyst_task(), self.chart_pattern_analysis_task(), self.fundamental_analysis_task(), self.reporter_task()],
+            # Async tasks run in the background, but before each synchronous
+            # task CrewAI waits for every pending async task. The run is
+            # therefore four stages: researcher, sentiment and technical
+            # analysis in parallel; fundamental analysis, which only needs
+            # the research but waits for all three; chart patterns, which
+            # build on the technical analysis; then the reporter.
+            # Chart patterns can't overlap fundamental analysis: an async
+            # task may only use another async task's output as context when
+            # a synchronous task sits between them, so chart patterns must
+            # follow a sync task, and fundamental analysis can't be made
+            # async for the same reason (its research context).
+            tasks=[self.researcher_task(), self.sentiment_analysis_task(), self.technical_analyst_task(), self.fundamental_analysis_task(), self.chart_pattern_analysis_task(), self.reporter_task()],
             process=Process.sequential,
-            verbose=True,
-            tracing=True,
+            verbose=self.verbose,
+            tracing=self.verbose,
         )
+
+
+# CrewBase injects its own load_yaml when the class is created, so the
+# cached loader has to be installed afterwards.
+StockAnalyser.load_yaml = staticmethod(_load_yaml)
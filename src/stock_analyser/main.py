@@ -1,19 +1,59 @@
 #!/usr/bin/env python
 import argparse
+import hashlib
+import os
 import sys
+import time
 import warnings
 import logging
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from pathlib import Path
 
+import orjson
 from dotenv import load_dotenv
 
 from stock_analyser.crew import StockAnalyser
 from stock_analyser.utils.logger import logger
-from backend.core.config import get_llm_model
+from stock_analyser.utils.paths import CACHE_DIR, ensure_output_dir, get_report_path
+from backend.core.config import LLMChoice, get_llm_model
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
+# Reports from identical runs (same inputs, model and agent/task config) are
+# reused for REPORT_CACHE_TTL seconds instead of re-running the crew.
+# REPORT_CACHE_TTL=0 disables the cache.
+REPORT_CACHE_DIR = Path(os.getenv("REPORT_CACHE_DIR", CACHE_DIR / "reports"))
+REPORT_CACHE_TTL = float(os.getenv("REPORT_CACHE_TTL", "3600"))
+CONFIG_DIR = Path(__file__).parent / "config"
+
+
+def _report_cache_path(inputs: dict, llm_model: str) -> Path:
+    digest = hashlib.sha256(orjson.dumps({"inputs": inputs, "llm": llm_model}, option=orjson.OPT_SORT_KEYS))
+    for name in ("agents.yaml", "tasks.yaml"):
+        digest.update((CONFIG_DIR / name).read_bytes())
+    return REPORT_CACHE_DIR / f"{digest.hexdigest()}.md"
+
+
+def _read_cached_report(cache_path: Path) -> bytes | None:
+    try:
+        if time.time() - cache_path.stat().st_mtime < REPORT_CACHE_TTL:
+            return cache_path.read_bytes()
+    except OSError:
+        pass
+    return None
+
+
+def _write_cached_report(cache_path: Path, report: bytes) -> None:
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(report)
+        tmp_path.replace(cache_path)
+    except OSError as e:
+        logger.warning(f"Could not cache report at {cache_path}: {e}")
+
 def run(stock_ticker: str, llm_choice: str):
     """
     Run the crew.
@@ -26,9 +66,53 @@ def run(stock_ticker: str, llm_choice: str):
     }
 
     try:
-        llm_model = get_llm_model(llm_choice)
+        llm_model = get_llm_model(llm_choice.lower())
+        report_path = get_report_path(inputs['name'], llm_model)
+        cache_path = _report_cache_path(inputs, llm_model) if REPORT_CACHE_TTL > 0 else None
+
+        cached = _read_cached_report(cache_path) if cache_path else None
+        if cached is not None:
+            ensure_output_dir()
+            report_path.write_bytes(cached)
+            logger.info(f"Reused cached report for {stock_ticker}: {report_path}")
+            return
+
         StockAnalyser(llm_model, stock_name=inputs['name']).crew().kickoff(inputs=inputs)
         logger.info("Stock Analyser crew successfully kicked off.")
+        if cache_path and report_path.exists():
+            _write_cached_report(cache_path, report_path.read_bytes())
     except Exception as e:
         logger.error(f"An error occurred while running the crew: {e}", exc_info=True)
         raise Exception(f"An error occurred while running the crew: {e}")
+
+
+def run_many(tickers: list[str], llm_choice: str, concurrency: int = 5) -> list[str]:
+    """
+    Run the crew for several tickers, up to `concurrency` at a time.
+
+    Each ticker gets its own crew instance. Returns the tickers that failed.
+    """
+    failed = []
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="crew") as pool:
+        futures = {pool.submit(run, ticker, llm_choice): ticker for ticker in tickers}
+        for future in as_completed(futures):
+            if future.exception() is not None:
+                failed.append(futures[future])
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Stock Analyser crew for one or more tickers.")
+    parser.add_argument("tickers", nargs="+", help="Stock ticker symbols, e.g. AAPL MSFT")
+    parser.add_argument("--llm", choices=[choice.value for choice in LLMChoice], default=LLMChoice.OPENAI.value)
+    parser.add_argument("--concurrency", type=int, default=5, help="Max tickers analysed at once")
+    args = parser.parse_args()
+
+    failed = run_many([ticker.upper() for ticker in args.tickers], args.llm, args.concurrency)
+    if failed:
+        logger.error(f"Analysis failed for: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
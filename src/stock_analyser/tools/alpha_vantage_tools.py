@@ -1,17 +1,54 @@
+import hashlib
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any
-from urllib.error import URLError, HTTPError
-from urllib.parse import urlencode
-from urllib.request import urlopen
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable
 
+import httpx
+import orjson
+import pandas as pd
 from crewai.tools import tool
 from stock_analyser.utils.logger import logger
+from stock_analyser.utils.paths import CACHE_DIR as PROJECT_CACHE_DIR
+from stock_analyser.utils.rate_limit import RateLimiter
 
 
 BASE_URL = "https://www.alphavantage.co/query"
 
+# Successful responses are cached on disk, so re-queries stay off the
+# (5 requests/minute) free tier. TTLs are per function, in seconds.
+CACHE_DIR = Path(os.getenv("AV_CACHE_DIR", PROJECT_CACHE_DIR / "alpha_vantage"))
+CACHE_TTL = {
+    "OVERVIEW": 86400,
+    "NEWS_SENTIMENT": 3600,
+    "TIME_SERIES_DAILY_ADJUSTED": 6 * 3600,
+    "INCOME_STATEMENT": 86400,
+    "BALANCE_SHEET": 86400,
+    "CASH_FLOW": 86400,
+}
+
+# Number of annual reports returned per financial statement
+STATEMENT_YEARS = 2
+
+# Free tier allows 5 requests/minute; over that Alpha Vantage answers with a
+# "Note" and the agent burns an LLM round trip retrying. Calls wait locally
+# instead. The limit is only enforced per process: every crew process
+# (WEB_CONCURRENCY web workers x CREW_POOL each, or run_many's threads in one
+# CLI process) has its own bucket, so the key as a whole can still exceed
+# it. Set AV_RATE_LIMIT to the key's limit divided by the number of crew
+# processes to stay under it.
+_rate_limiter = RateLimiter(int(os.getenv("AV_RATE_LIMIT", "5")), per=60.0)
+
+
+@lru_cache(maxsize=1)
+def _get_client() -> httpx.Client:
+    """Shared HTTP client, so repeated calls reuse one pooled connection."""
+    return httpx.Client(timeout=20, http2=True)
+
 
 def _get_api_key() -> str | None:
     return os.getenv("ALPHAVANTAGE_API_KEY")
@@ -26,17 +63,100 @@ def _no_key_error() -> dict[str, Any]:
     }
 
 
-def _request(params: dict[str, Any]) -> dict[str, Any]:
+def _cache_path(params: dict[str, Any]) -> Path:
+    key = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    return CACHE_DIR / f"{key}.json"
+
+
+def _read_cache(params: dict[str, Any], fresh_only: bool = True) -> dict[str, Any] | None:
+    ttl = CACHE_TTL.get(params.get("function"))
+    if not ttl:
+        return None
+    path = _cache_path(params)
+    try:
+        if not fresh_only or time.time() - path.stat().st_mtime < ttl:
+            return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        pass
+    return None
+
+
+def _body_digest(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def _revalidate_cache(params: dict[str, Any], digest: str) -> dict[str, Any] | None:
+    """
+    Return the expired cache entry if it came from an identical response.
+
+    Alpha Vantage sends no ETag, so the body hash stands in for one: an
+    unchanged overview or statement is not parsed (or trimmed) again, and
+    its entry is renewed for another TTL.
+    """
+    path = _cache_path(params)
+    try:
+        if path.with_suffix(".digest").read_text() != digest:
+            return None
+    except OSError:
+        return None
+    cached = _read_cache(params, fresh_only=False)
+    if cached is not None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+    return cached
+
+
+def _write_cache(params: dict[str, Any], data: dict[str, Any], digest: str) -> None:
+    if params.get("function") not in CACHE_TTL:
+        return
+    path = _cache_path(params)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(orjson.dumps(data))
+        tmp_path.replace(path)
+        path.with_suffix(".digest").write_text(digest)
+    except OSError as e:
+        logger.warning(f"Could not write Alpha Vantage cache: {e}")
+
+
+def _request(
+    params: dict[str, Any], trim: Callable[[dict[str, Any]], dict[str, Any]] | None = None
+) -> dict[str, Any]:
+    """
+    Call Alpha Vantage, using the on-disk cache when possible.
+
+    `trim` is applied to a successful response before it is cached, so
+    callers that only use part of a large payload cache just that part.
+    """
     api_key = _get_api_key()
     if not api_key:
         return _no_key_error()
+    cached = _read_cache(params)
+    if cached is not None:
+        logger.debug("Alpha Vantage cache hit for %s", params.get('function'))
+        return cached
+    # Cache key excludes the API key
+    cache_params = dict(params)
     params["apikey"] = api_key
-    url = f"{BASE_URL}?{urlencode(params)}"
+    waited = _rate_limiter.acquire()
+    if waited:
+        logger.debug("Waited %.1fs for Alpha Vantage rate limit", waited)
     try:
-        with urlopen(url, timeout=20) as response:
-            raw = response.read().decode("utf-8")
-        data = json.loads(raw)
-    except (HTTPError, URLError) as e:
+        response = _get_client().get(BASE_URL, params=params)
+        response.raise_for_status()
+        digest = _body_digest(response.content)
+        cached = _revalidate_cache(cache_params, digest)
+        if cached is not None:
+            logger.debug("Alpha Vantage response unchanged for %s", params.get('function'))
+            return cached
+        # The full daily series is several MB; orjson parses the raw bytes
+        # directly instead of decoding to str for json.loads first
+        data = orjson.loads(response.content)
+    except httpx.HTTPError as e:
         logger.warning(f"Alpha Vantage request error: {e}")
         return {
             "error": f"Alpha Vantage request failed: {e}",
@@ -68,9 +188,21 @@ def _request(params: dict[str, Any]) -> dict[str, Any]:
                 "error_type": "invalid_request",
                 "action": "Check parameters or use alternative data sources.",
             }
+        if trim:
+            data = trim(data)
+        _write_cache(cache_params, data, digest)
     return data
 
 
+def _trim_statement(data: dict[str, Any]) -> dict[str, Any]:
+    # Statements carry ~20 years of annual and quarterly reports; only the
+    # latest STATEMENT_YEARS annual reports are used
+    return {
+        "symbol": data.get("symbol"),
+        "annualReports": data.get("annualReports", [])[:STATEMENT_YEARS],
+    }
+
+
 @tool("get_av_news_sentiment")
 def get_av_news_sentiment(symbol: str) -> dict[str, Any]:
     """Get news sentiment for `symbol` using Alpha Vantage."""
@@ -111,7 +243,10 @@ def get_av_news_sentiment(symbol: str) -> dict[str, Any]:
 
 @tool("get_av_historical_candles")
 def get_av_historical_candles(symbol: str, days: int = 180) -> dict[str, Any]:
-    """Get daily candle data (Date, Close) for the last N days using Alpha Vantage."""
+    """
+    Get daily candle data for the last N days using Alpha Vantage.
+    Candles are column-wise: {"Date": [...], "Close": [...]}, oldest first.
+    """
     data = _request(
         {
             "function": "TIME_SERIES_DAILY_ADJUSTED",
@@ -133,25 +268,16 @@ def get_av_historical_candles(symbol: str, days: int = 180) -> dict[str, Any]:
         }
 
     cutoff_date = datetime.utcnow().date() - timedelta(days=days)
-    candles = []
-    for date_str, values in series.items():
-        try:
-            date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
-        except ValueError:
-            continue
-        if date_obj < cutoff_date:
-            continue
-        close_value = values.get("4. close")
-        if close_value is None:
-            continue
-        try:
-            close_float = float(close_value)
-        except (TypeError, ValueError):
-            continue
-        candles.append({"Date": date_str, "Close": close_float})
-
-    candles.sort(key=lambda x: x["Date"])
-    if not candles:
+    # Parse and filter the whole series at once; the full output covers
+    # 20+ years of bars, so per-row strptime dominated this tool
+    date_strs = pd.Index(list(series.keys()))
+    dates = pd.to_datetime(date_strs, format="%Y-%m-%d", errors="coerce")
+    closes = pd.to_numeric(
+        pd.Series([values.get("4. close") for values in series.values()]), errors="coerce"
+    ).to_numpy()
+    mask = (dates >= pd.Timestamp(cutoff_date)) & pd.notna(closes)
+    frame = pd.DataFrame({"Date": date_strs[mask], "Close": closes[mask]})
+    if frame.empty:
         return {
             "error": "No candle data available for requested range",
             "symbol": symbol,
@@ -160,10 +286,14 @@ def get_av_historical_candles(symbol: str, days: int = 180) -> dict[str, Any]:
             "action": "Skip candle data and continue with other sources.",
         }
 
+    # Candles are returned column-wise ({"Date": [...], "Close": [...]}):
+    # one list per field instead of a dict per bar. The technical analysis
+    # and visualization tools load either shape with pd.DataFrame().
+    # ISO dates sort chronologically as strings.
     return {
         "symbol": symbol,
-        "count": len(candles),
-        "candles": candles,
+        "count": len(frame),
+        "candles": frame.sort_values("Date").to_dict("list"),
     }
 
 
@@ -206,9 +336,12 @@ def get_av_company_overview(symbol: str) -> dict[str, Any]:
 @tool("get_av_financial_statements")
 def get_av_financial_statements(symbol: str) -> dict[str, Any]:
     """Get last 2 years of income, balance sheet, and cash flow statements."""
-    income = _request({"function": "INCOME_STATEMENT", "symbol": symbol})
-    balance = _request({"function": "BALANCE_SHEET", "symbol": symbol})
-    cash_flow = _request({"function": "CASH_FLOW", "symbol": symbol})
+    # The three statements are independent, so fetch them concurrently
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        income, balance, cash_flow = pool.map(
+            lambda function: _request({"function": function, "symbol": symbol}, trim=_trim_statement),
+            ["INCOME_STATEMENT", "BALANCE_SHEET", "CASH_FLOW"],
+        )
 
     if "error" in income and "error" in balance and "error" in cash_flow:
         return income
@@ -221,17 +354,17 @@ def get_av_financial_statements(symbol: str) -> dict[str, Any]:
     if "error" in income:
         errors.append({"source": "income_statement", "error": income.get("error")})
     else:
-        income_reports = income.get("annualReports", [])[:2]
+        income_reports = income.get("annualReports", [])
 
     if "error" in balance:
         errors.append({"source": "balance_sheet", "error": balance.get("error")})
     else:
-        balance_reports = balance.get("annualReports", [])[:2]
+        balance_reports = balance.get("annualReports", [])
 
     if "error" in cash_flow:
         errors.append({"source": "cash_flow", "error": cash_flow.get("error")})
     else:
-        cash_reports = cash_flow.get("annualReports", [])[:2]
+        cash_reports = cash_flow.get("annualReports", [])
 
     if not income_reports and not balance_reports and not cash_reports:
         return {
@@ -253,6 +386,26 @@ def get_av_financial_statements(symbol: str) -> dict[str, Any]:
     return result
 
 
+@tool("get_av_full_bundle")
+def get_av_full_bundle(symbol: str) -> dict[str, Any]:
+    """
+    Get company overview, last 2 years of financial statements, news sentiment
+    and 180 days of daily candles for `symbol` in one call using Alpha Vantage.
+    Each section has the same shape (or error) as the individual get_av_* tool.
+    """
+    # Fetched concurrently, and returned together so the agent needs one
+    # tool round trip instead of four
+    sections = {
+        "overview": get_av_company_overview,
+        "financial_statements": get_av_financial_statements,
+        "news_sentiment": get_av_news_sentiment,
+        "historical_candles": get_av_historical_candles,
+    }
+    with ThreadPoolExecutor(max_workers=len(sections)) as pool:
+        futures = {name: pool.submit(fetch.func, symbol) for name, fetch in sections.items()}
+        return {"symbol": symbol, **{name: future.result() for name, future in futures.items()}}
+
+
 def get_alpha_vantage_tools() -> list[Any]:
     """Return Alpha Vantage tools. Raises if key missing to match existing pattern."""
     if not os.getenv("ALPHAVANTAGE_API_KEY"):
@@ -262,4 +415,5 @@ def get_alpha_vantage_tools() -> list[Any]:
         get_av_historical_candles,
         get_av_company_overview,
         get_av_financial_statements,
+        get_av_full_bundle,
     ]
@@ -1,19 +1,293 @@
+import inspect
 import os
+import random
 import re
-from datetime import datetime, timedelta
-from typing import Any
-import finnhub
-from finnhub.exceptions import FinnhubAPIException
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache, wraps
+from pathlib import Path
+from typing import Any, Callable
+import httpx
+import numpy as np
+import orjson
 from crewai.tools import tool
+from stock_analyser.utils.cache import TTLCache
 from stock_analyser.utils.logger import logger
+from stock_analyser.utils.paths import CACHE_DIR
+from stock_analyser.utils.rate_limit import RateLimiter
 
+FINNHUB_API_BASE_URL = "https://finnhub.io/api/v1"
 
-def _get_finnhub_client() -> finnhub.Client | None:
-    """Create a Finnhub client using FINNHUB_API_KEY (or return None if missing)."""
+# Finnhub's effective cap is per second (30/s on the free plan). Requests
+# wait locally just under it instead of drawing 429s that the agent then
+# retries. Like the Alpha Vantage limiter, this is only enforced per
+# process, not across the crew process pool.
+_rate_limiter = RateLimiter(int(os.getenv("FINNHUB_RATE_LIMIT", "25")), per=1.0)
+
+# Transient failures (rate limit, server errors) are retried here with
+# exponential backoff and jitter, honouring Retry-After, rather than being
+# handed back to the agent to retry on its next turn
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+
+# Daily candles for completed months never change, so they are kept on disk
+# in one file per (symbol, resolution, month) and only the current month is
+# refetched
+CANDLE_CACHE_DIR = Path(os.getenv("FINNHUB_CACHE_DIR", CACHE_DIR / "finnhub_candles"))
+CANDLE_FIELDS = ("t", "o", "h", "l", "c", "v")
+
+# Successful tool results, so agent steps revisiting a symbol skip the
+# network (and Finnhub's rate limit). TTLs are set per tool below.
+_response_cache = TTLCache(maxsize=1024)
+
+# Cache misses currently being fetched, so concurrent callers for the same
+# key (e.g. parallel agents) wait for one request instead of each sending one
+_inflight: dict[tuple, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _cached(ttl: float | Callable[[dict[str, Any]], float]):
+    """
+    Cache a tool function's successful results for `ttl` seconds.
+
+    `ttl` may be a function of the call's arguments. Results containing an
+    "error" key are never cached. Concurrent misses for the same arguments
+    share a single call.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (func.__name__, *bound.arguments.items())
+            result = _response_cache.get(key)
+            if result is not None:
+                return result
+
+            with _inflight_lock:
+                # Re-check: a call may have finished since the lookup above
+                result = _response_cache.get(key)
+                if result is not None:
+                    return result
+                future = _inflight.get(key)
+                leader = future is None
+                if leader:
+                    future = _inflight[key] = Future()
+            if not leader:
+                return future.result()
+
+            try:
+                result = func(*args, **kwargs)
+                if "error" not in result:
+                    _response_cache.set(key, result, ttl(bound.arguments) if callable(ttl) else ttl)
+                future.set_result(result)
+                return result
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with _inflight_lock:
+                    del _inflight[key]
+        return wrapper
+    return decorator
+
+
+def _json_result(func):
+    """
+    Return a tool function's successful results as a JSON string.
+
+    CrewAI puts tool output into the prompt with `str()`. Encoding with
+    orjson up front is faster than building the dict's repr, and it gives
+    the model compact JSON. Error dicts are returned unchanged.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        result = func(*args, **kwargs)
+        if "error" in result:
+            return result
+        return orjson.dumps(result).decode()
+    return wrapper
+
+
+def _candle_ttl(arguments: dict[str, Any]) -> float:
+    # Daily and longer bars only change once a day; intraday bars keep moving
+    return 86400 if arguments["resolution"] in {"D", "W", "M"} else 60
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    retry_after = response.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return min(RETRY_MAX_DELAY, float(retry_after))
+    return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt) + random.uniform(0, 0.25)
+
+
+class FinnhubHTTP:
+    """
+    Minimal Finnhub REST client for the endpoints used by the tools.
+
+    Method names and arguments mirror `finnhub.Client`, but requests go
+    through one httpx client (HTTP/2, pooled keep-alive connections), are
+    paced by the shared rate limiter, and responses are decoded with
+    orjson. 429 and 5xx responses are retried with backoff; other HTTP
+    errors, and the final failed retry, raise `httpx.HTTPStatusError`.
+    """
+
+    __slots__ = ("_client",)
+
+    def __init__(self, api_key: str):
+        self._client = httpx.Client(
+            base_url=FINNHUB_API_BASE_URL,
+            headers={"X-Finnhub-Token": api_key},
+            http2=True,
+            timeout=10,
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
+
+    def _get(self, path: str, params: dict[str, Any]) -> Any:
+        for attempt in range(MAX_RETRIES + 1):
+            _rate_limiter.acquire()
+            response = self._client.get(path, params=params)
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                break
+            delay = _retry_delay(response, attempt)
+            logger.debug("Finnhub %s returned %s, retrying in %.2fs", path, response.status_code, delay)
+            time.sleep(delay)
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    def quote(self, symbol: str) -> dict[str, Any]:
+        return self._get("/quote", {"symbol": symbol})
+
+    def stock_candles(self, symbol: str, resolution: str, _from: int, to: int) -> dict[str, Any]:
+        return self._get("/stock/candle", {"symbol": symbol, "resolution": resolution, "from": _from, "to": to})
+
+    def company_basic_financials(self, symbol: str, metric: str) -> dict[str, Any]:
+        return self._get("/stock/metric", {"symbol": symbol, "metric": metric})
+
+    def company_news(self, symbol: str, _from: str, to: str) -> list[dict[str, Any]]:
+        return self._get("/company-news", {"symbol": symbol, "from": _from, "to": to})
+
+    def news_sentiment(self, symbol: str) -> dict[str, Any]:
+        return self._get("/news-sentiment", {"symbol": symbol})
+
+    def recommendation_trends(self, symbol: str) -> list[dict[str, Any]]:
+        return self._get("/stock/recommendation", {"symbol": symbol})
+
+
+@lru_cache(maxsize=1)
+def _get_finnhub_client_cached(api_key: str) -> FinnhubHTTP:
+    # One client per key, so calls reuse pooled keep-alive connections
+    # instead of a new TLS handshake each time
+    return FinnhubHTTP(api_key)
+
+
+def _get_finnhub_client() -> FinnhubHTTP | None:
+    """Return the Finnhub client for FINNHUB_API_KEY (or None if missing)."""
     api_key = os.getenv("FINNHUB_API_KEY")
     if not api_key:
         return None
-    return finnhub.Client(api_key=api_key)
+    return _get_finnhub_client_cached(api_key)
+
+
+def _month_bounds(year: int, month: int) -> tuple[int, int]:
+    """First and last second (UTC timestamps) of a month."""
+    start = datetime(year, month, 1, tzinfo=timezone.utc)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+    return int(start.timestamp()), int(end.timestamp()) - 1
+
+
+def _months_between(from_ts: int, to_ts: int) -> list[tuple[int, int]]:
+    start = datetime.fromtimestamp(from_ts, timezone.utc)
+    end = datetime.fromtimestamp(to_ts, timezone.utc)
+    return [
+        (index // 12, index % 12 + 1)
+        for index in range(start.year * 12 + start.month - 1, end.year * 12 + end.month)
+    ]
+
+
+def _candle_bucket_path(symbol: str, resolution: str, year: int, month: int) -> Path:
+    safe_symbol = re.sub(r"[^A-Za-z0-9.\-]", "_", symbol)
+    return CANDLE_CACHE_DIR / f"{safe_symbol}_{resolution}_{year}-{month:02d}.json"
+
+
+def _read_candle_bucket(path: Path) -> dict[str, list] | None:
+    try:
+        return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def _write_candle_bucket(path: Path, bucket: dict[str, list]) -> None:
+    try:
+        CANDLE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(orjson.dumps(bucket))
+        tmp_path.replace(path)
+    except OSError as e:
+        logger.warning(f"Could not write Finnhub candle cache: {e}")
+
+
+def _get_candles(client: FinnhubHTTP, symbol: str, resolution: str, from_ts: int, to_ts: int) -> dict[str, Any]:
+    """
+    `client.stock_candles` with daily bars cached on disk by calendar month.
+
+    Months missing from the cache are fetched whole in one request (so they
+    can be stored complete) and the result is sliced to [from_ts, to_ts].
+    Other resolutions go straight to the API.
+    """
+    if resolution != "D":
+        return client.stock_candles(symbol, resolution, from_ts, to_ts)
+
+    months = _months_between(from_ts, to_ts)
+    if not months:
+        return {"s": "no_data"}
+    now = datetime.now(timezone.utc)
+    current_month = (now.year, now.month)
+    buckets: dict[tuple[int, int], dict[str, list]] = {}
+    for month in months:
+        if month < current_month:
+            bucket = _read_candle_bucket(_candle_bucket_path(symbol, resolution, *month))
+            if bucket is not None:
+                buckets[month] = bucket
+
+    missing = [month for month in months if month not in buckets]
+    if missing:
+        fetch_from = _month_bounds(*missing[0])[0]
+        fetch_to = min(_month_bounds(*missing[-1])[1], int(now.timestamp()))
+        data = client.stock_candles(symbol, resolution, fetch_from, fetch_to)
+        if data.get("s") not in ("ok", "no_data"):
+            return data
+        fetched = {month: {field: [] for field in CANDLE_FIELDS} for month in missing}
+        columns = [data.get(field, []) for field in CANDLE_FIELDS]
+        for row in zip(*columns):
+            bar_time = datetime.fromtimestamp(row[0], timezone.utc)
+            bucket = fetched.get((bar_time.year, bar_time.month))
+            if bucket is not None:
+                for field, value in zip(CANDLE_FIELDS, row):
+                    bucket[field].append(value)
+        for month, bucket in fetched.items():
+            buckets[month] = bucket
+            if month < current_month:
+                _write_candle_bucket(_candle_bucket_path(symbol, resolution, *month), bucket)
+
+    # Stitch the months together and trim to the requested window
+    timestamps = np.concatenate([np.asarray(buckets[month]["t"], dtype=np.int64) for month in months])
+    keep = np.flatnonzero((timestamps >= from_ts) & (timestamps <= to_ts))
+    if not keep.size:
+        return {"s": "no_data"}
+    # Select from plain lists so values keep their JSON types (e.g. int volume)
+    result: dict[str, Any] = {"s": "ok"}
+    for field in CANDLE_FIELDS:
+        values = [value for month in months for value in buckets[month][field]]
+        result[field] = [values[index] for index in keep]
+    return result
 
 
 def _no_key_error() -> dict[str, Any]:
@@ -25,15 +299,39 @@ def _no_key_error() -> dict[str, Any]:
     }
 
 
+_STATUS_CODE_RE = re.compile(r"status_code:\s*(\d+)")
+
+# Status code (5xx collapsed to 500) -> (error, retryable, error_type, action)
+# for the LLM-facing error returned by _handle_error
+_ACCESS_DENIED = (
+    "Access denied for {tool_name}. This requires a Finnhub premium subscription.",
+    False,
+    "access_denied",
+    "DO NOT retry this tool. Skip this data and continue with other sources.",
+)
+_STATUS_ERRORS: dict[int | None, tuple[str, bool, str, str]] = {
+    # 401/403 = access denied (premium feature or invalid permissions)
+    401: _ACCESS_DENIED,
+    403: _ACCESS_DENIED,
+    429: (
+        "{tool_name} rate-limited by Finnhub.",
+        True,
+        "rate_limited",
+        "Retry later with backoff or use alternative data sources.",
+    ),
+    500: (
+        "{tool_name} unavailable due to Finnhub server error.",
+        True,
+        "server_error",
+        "Retry later or use alternative data sources.",
+    ),
+}
+
+
 def _extract_status_code(e: Exception) -> int | None:
-    if isinstance(e, FinnhubAPIException):
-        status_code = getattr(e, "status_code", None)
-        if status_code is not None:
-            try:
-                return int(status_code)
-            except (TypeError, ValueError):
-                return None
-    match = re.search(r"status_code:\s*(\d+)", str(e))
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code
+    match = _STATUS_CODE_RE.search(str(e))
     if match:
         return int(match.group(1))
     return None
@@ -41,293 +339,336 @@ def _extract_status_code(e: Exception) -> int | None:
 
 def _handle_error(tool_name: str, symbol: str, e: Exception) -> dict[str, Any]:
     """Return LLM-friendly error with clear instruction not to retry."""
-    error_str = str(e)
     status_code = _extract_status_code(e)
-
-    # 401/403 = access denied (premium feature or invalid permissions)
-    if status_code in {401, 403}:
+    key = 500 if status_code and 500 <= status_code < 600 else status_code
+    template = _STATUS_ERRORS.get(key)
+    if template is None:
+        # Generic error
         return {
-            "error": f"Access denied for {tool_name}. This requires a Finnhub premium subscription.",
+            "error": f"{tool_name} failed: {e}",
             "symbol": symbol,
             "status_code": status_code,
             "retryable": False,
-            "error_type": "access_denied",
-            "action": "DO NOT retry this tool. Skip this data and continue with other sources.",
-        }
-
-    # 429 = rate limited
-    if status_code == 429:
-        return {
-            "error": f"{tool_name} rate-limited by Finnhub.",
-            "symbol": symbol,
-            "status_code": status_code,
-            "retryable": True,
-            "error_type": "rate_limited",
-            "action": "Retry later with backoff or use alternative data sources.",
+            "error_type": "unknown_error",
+            "action": "DO NOT retry this tool with the same parameters. Try alternative data sources.",
         }
-
-    # 5xx = server errors
-    if status_code and 500 <= status_code < 600:
-        return {
-            "error": f"{tool_name} unavailable due to Finnhub server error.",
-            "symbol": symbol,
-            "status_code": status_code,
-            "retryable": True,
-            "error_type": "server_error",
-            "action": "Retry later or use alternative data sources.",
-        }
-
-    # Generic error
+    error, retryable, error_type, action = template
     return {
-        "error": f"{tool_name} failed: {error_str}",
+        "error": error.format(tool_name=tool_name),
         "symbol": symbol,
         "status_code": status_code,
-        "retryable": False,
-        "error_type": "unknown_error",
-        "action": "DO NOT retry this tool with the same parameters. Try alternative data sources.",
+        "retryable": retryable,
+        "error_type": error_type,
+        "action": action,
     }
 
 
+def _finnhub_call(endpoint: str):
+    """
+    Give a tool function a Finnhub client and the shared error handling.
+
+    The wrapped function takes the client as its first argument, which is
+    left out of the tool's signature. Without an API key it returns the
+    missing-key error. Exceptions are logged against `endpoint` and turned
+    into `_handle_error` results.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            client = _get_finnhub_client()
+            if not client:
+                return _no_key_error()
+            symbol = args[0] if args else kwargs.get("symbol")
+            try:
+                return func(client, *args, **kwargs)
+            except httpx.HTTPStatusError as e:
+                logger.warning("Finnhub %s error for %s: %s", endpoint, symbol, e)
+                return _handle_error(func.__name__, symbol, e)
+            except Exception as e:
+                logger.error("Finnhub %s error for %s: %s", endpoint, symbol, e, exc_info=True)
+                return _handle_error(func.__name__, symbol, e)
+
+        wrapper.__signature__ = signature.replace(parameters=list(signature.parameters.values())[1:])
+        return wrapper
+    return decorator
+
+
 @tool("get_real_time_quote")
-def get_real_time_quote(symbol: str) -> dict[str, Any]:
+@_cached(ttl=5)
+@_finnhub_call("quote")
+def get_real_time_quote(client: FinnhubHTTP, symbol: str) -> dict[str, Any]:
     """Get a real-time quote for `symbol` using Finnhub."""
-    client = _get_finnhub_client()
-    if not client:
-        return _no_key_error()
-    try:
-        q = client.quote(symbol)
-        return {
-            "symbol": symbol,
-            "currentPrice": q.get("c"),
-            "dayHigh": q.get("h"),
-            "dayLow": q.get("l"),
-            "openPrice": q.get("o"),
-            "previousClose": q.get("pc"),
-            "timestamp": q.get("t"),
-        }
-    except FinnhubAPIException as e:
-        logger.warning(f"Finnhub quote error for {symbol}: {e}")
-        return _handle_error("get_real_time_quote", symbol, e)
-    except Exception as e:
-        logger.error(f"Finnhub quote error for {symbol}: {e}", exc_info=True)
-        return _handle_error("get_real_time_quote", symbol, e)
+    q = client.quote(symbol)
+    return {
+        "symbol": symbol,
+        "currentPrice": q.get("c"),
+        "dayHigh": q.get("h"),
+        "dayLow": q.get("l"),
+        "openPrice": q.get("o"),
+        "previousClose": q.get("pc"),
+        "timestamp": q.get("t"),
+    }
 
 
 @tool("get_historical_prices")
+@_json_result
+@_cached(ttl=_candle_ttl)
+@_finnhub_call("stock_candles")
 def get_historical_prices(
+    client: FinnhubHTTP,
     symbol: str,
     resolution: str,
     from_ts: int,
     to_ts: int
-) -> dict[str, Any]:
+) -> dict[str, Any] | str:
     """Get summarized historical price data (min, max, avg, last close)."""
-    client = _get_finnhub_client()
-    if not client:
-        return _no_key_error()
-    try:
-        data = client.stock_candles(symbol, resolution, from_ts, to_ts)
-        status = data.get("s")
-        if status and status != "ok":
-            return {
-                "error": "No price data available",
-                "symbol": symbol,
-                "status": status,
-                "retryable": False,
-                "error_type": "no_data",
-                "action": "Skip historical prices and continue with other sources.",
-            }
-        closes = data.get("c", [])
-        if not closes:
-            return {
-                "error": "No price data available",
-                "symbol": symbol,
-                "retryable": False,
-                "error_type": "no_data",
-                "action": "Skip historical prices and continue with other sources.",
-            }
+    data = _get_candles(client, symbol, resolution, from_ts, to_ts)
+    status = data.get("s")
+    if status and status != "ok":
         return {
+            "error": "No price data available",
             "symbol": symbol,
-            "period": {"from": from_ts, "to": to_ts},
-            "count": len(closes),
-            "min_close": round(min(closes), 2),
-            "max_close": round(max(closes), 2),
-            "avg_close": round(sum(closes) / len(closes), 2),
-            "last_close": round(closes[-1], 2),
+            "status": status,
+            "retryable": False,
+            "error_type": "no_data",
+            "action": "Skip historical prices and continue with other sources.",
         }
-    except FinnhubAPIException as e:
-        logger.warning(f"Finnhub stock_candles error for {symbol}: {e}")
-        return _handle_error("get_historical_prices", symbol, e)
-    except Exception as e:
-        logger.error(f"Finnhub stock_candles error for {symbol}: {e}", exc_info=True)
-        return _handle_error("get_historical_prices", symbol, e)
+    closes = data.get("c", [])
+    if not closes:
+        return {
+            "error": "No price data available",
+            "symbol": symbol,
+            "retryable": False,
+            "error_type": "no_data",
+            "action": "Skip historical prices and continue with other sources.",
+        }
+    closes = np.asarray(closes, dtype=np.float64)
+    return {
+        "symbol": symbol,
+        "period": {"from": from_ts, "to": to_ts},
+        "count": len(closes),
+        "min_close": round(float(closes.min()), 2),
+        "max_close": round(float(closes.max()), 2),
+        "avg_close": round(float(closes.mean()), 2),
+        "last_close": round(float(closes[-1]), 2),
+    }
 
 
 @tool("get_historical_candles")
+@_cached(ttl=_candle_ttl)
+@_finnhub_call("stock_candles")
 def get_historical_candles(
+    client: FinnhubHTTP,
     symbol: str,
     resolution: str = "D",
     days: int = 180
 ) -> dict[str, Any]:
-    """Get historical candle data (Date, Close) for the last N days."""
-    client = _get_finnhub_client()
-    if not client:
-        return _no_key_error()
-    try:
-        to_ts = int(datetime.utcnow().timestamp())
-        from_ts = int((datetime.utcnow() - timedelta(days=days)).timestamp())
-        data = client.stock_candles(symbol, resolution, from_ts, to_ts)
-        status = data.get("s")
-        if status and status != "ok":
-            return {
-                "error": "No candle data available",
-                "symbol": symbol,
-                "status": status,
-                "retryable": False,
-                "error_type": "no_data",
-                "action": "Skip candle data and continue with other sources.",
-            }
-        timestamps = data.get("t", [])
-        closes = data.get("c", [])
-        if not timestamps or not closes:
-            return {
-                "error": "No candle data available",
-                "symbol": symbol,
-                "retryable": False,
-                "error_type": "no_data",
-                "action": "Skip candle data and continue with other sources.",
-            }
-        candles = [
-            {
-                "Date": datetime.utcfromtimestamp(ts).strftime("%Y-%m-%d"),
-                "Close": close,
-            }
-            for ts, close in zip(timestamps, closes)
-        ]
+    """Get historical candle data (Date, Open, High, Low, Close, Volume columns) for the last N days."""
+    to_ts = int(time.time())
+    from_ts = to_ts - days * 86400
+    data = _get_candles(client, symbol, resolution, from_ts, to_ts)
+    status = data.get("s")
+    if status and status != "ok":
         return {
+            "error": "No candle data available",
             "symbol": symbol,
-            "resolution": resolution,
-            "count": len(candles),
-            "candles": candles,
+            "status": status,
+            "retryable": False,
+            "error_type": "no_data",
+            "action": "Skip candle data and continue with other sources.",
+        }
+    timestamps = data.get("t", [])
+    closes = data.get("c", [])
+    if not timestamps or not closes:
+        return {
+            "error": "No candle data available",
+            "symbol": symbol,
+            "retryable": False,
+            "error_type": "no_data",
+            "action": "Skip candle data and continue with other sources.",
         }
-    except FinnhubAPIException as e:
-        logger.warning(f"Finnhub stock_candles error for {symbol}: {e}")
-        return _handle_error("get_historical_candles", symbol, e)
-    except Exception as e:
-        logger.error(f"Finnhub stock_candles error for {symbol}: {e}", exc_info=True)
-        return _handle_error("get_historical_candles", symbol, e)
+    # datetime64 formats every timestamp in one pass; per-bar
+    # utcfromtimestamp/strftime dominated intraday resolutions
+    dates = np.asarray(timestamps, dtype="datetime64[s]").astype("datetime64[D]").astype(str).tolist()
+    # Column-wise like get_av_historical_candles: one list per field, so the
+    # technical analysis and visualization tools build their DataFrame
+    # straight from the columns
+    candles = {"Date": dates, "Close": closes}
+    for field, column in (("o", "Open"), ("h", "High"), ("l", "Low"), ("v", "Volume")):
+        if len(data.get(field, ())) == len(dates):
+            candles[column] = data[field]
+    return {
+        "symbol": symbol,
+        "resolution": resolution,
+        "count": len(dates),
+        "candles": candles,
+    }
 
 
 @tool("get_fundamental_data")
-def get_fundamental_data(symbol: str, metric_type: str = "all") -> dict[str, Any]:
+@_cached(ttl=3600)
+@_finnhub_call("fundamentals")
+def get_fundamental_data(client: FinnhubHTTP, symbol: str, metric_type: str = "all") -> dict[str, Any]:
     """Get key financial metrics for `symbol` (PE, EPS, market cap, 52-week range, etc.)."""
-    client = _get_finnhub_client()
-    if not client:
-        return _no_key_error()
-    try:
-        data = client.company_basic_financials(symbol, metric_type)
-        metrics = data.get("metric", {})
-        # Extract only the most important metrics to reduce token usage
-        key_metrics = {
-            "symbol": symbol,
-            "peRatio": metrics.get("peNormalizedAnnual"),
-            "eps": metrics.get("epsNormalizedAnnual"),
-            "marketCap": metrics.get("marketCapitalization"),
-            "52WeekHigh": metrics.get("52WeekHigh"),
-            "52WeekLow": metrics.get("52WeekLow"),
-            "dividendYield": metrics.get("dividendYieldIndicatedAnnual"),
-            "beta": metrics.get("beta"),
-            "priceToBook": metrics.get("pbAnnual"),
-            "priceToSales": metrics.get("psAnnual"),
-            "revenuePerShare": metrics.get("revenuePerShareAnnual"),
-            "roe": metrics.get("roeRfy"),
-            "debtToEquity": metrics.get("totalDebt/totalEquityAnnual"),
-        }
-        # Remove None values to keep response clean
-        return {k: v for k, v in key_metrics.items() if v is not None}
-    except FinnhubAPIException as e:
-        logger.warning(f"Finnhub fundamentals error for {symbol}: {e}")
-        return _handle_error("get_fundamental_data", symbol, e)
-    except Exception as e:
-        logger.error(f"Finnhub fundamentals error for {symbol}: {e}", exc_info=True)
-        return _handle_error("get_fundamental_data", symbol, e)
+    data = client.company_basic_financials(symbol, metric_type)
+    metrics = data.get("metric", {})
+    # Extract only the most important metrics to reduce token usage
+    key_metrics = {
+        "symbol": symbol,
+        "peRatio": metrics.get("peNormalizedAnnual"),
+        "eps": metrics.get("epsNormalizedAnnual"),
+        "marketCap": metrics.get("marketCapitalization"),
+        "52WeekHigh": metrics.get("52WeekHigh"),
+        "52WeekLow": metrics.get("52WeekLow"),
+        "dividendYield": metrics.get("dividendYieldIndicatedAnnual"),
+        "beta": metrics.get("beta"),
+        "priceToBook": metrics.get("pbAnnual"),
+        "priceToSales": metrics.get("psAnnual"),
+        "revenuePerShare": metrics.get("revenuePerShareAnnual"),
+        "roe": metrics.get("roeRfy"),
+        "debtToEquity": metrics.get("totalDebt/totalEquityAnnual"),
+    }
+    # Remove None values to keep response clean
+    return {k: v for k, v in key_metrics.items() if v is not None}
+
+
+# get_company_news only returns the newest few articles, so it first asks
+# for just the last NEWS_WINDOW_DAYS of the range and widens to the full
+# range only if that window holds too few
+NEWS_ARTICLE_LIMIT = 5
+NEWS_WINDOW_DAYS = 3
+
+
+def _recent_news(client: FinnhubHTTP, symbol: str, from_date: str, to_date: str) -> tuple[list[dict[str, Any]], str]:
+    """Return the news and the start date of the window it was taken from."""
+    window_start = (datetime.strptime(to_date, "%Y-%m-%d") - timedelta(days=NEWS_WINDOW_DAYS)).strftime("%Y-%m-%d")
+    if window_start > from_date:
+        news = client.company_news(symbol, window_start, to_date)
+        if len(news) >= NEWS_ARTICLE_LIMIT:
+            return news, window_start
+    return client.company_news(symbol, from_date, to_date), from_date
 
 
 @tool("get_company_news")
-def get_company_news(symbol: str, from_date: str, to_date: str) -> dict[str, Any]:
-    """Get recent company news for `symbol` (max 5 articles, headline + summary only)."""
-    client = _get_finnhub_client()
-    if not client:
-        return _no_key_error()
-    try:
-        news = client.company_news(symbol, from_date, to_date)
-        # Limit to 5 articles, extract only essential fields
-        summarized = [
-            {
-                "headline": article.get("headline"),
-                "summary": article.get("summary", "")[:200],  # Truncate long summaries
-                "source": article.get("source"),
-                "datetime": article.get("datetime"),
-            }
-            for article in news[:5]
-        ]
-        return {"symbol": symbol, "count": len(news), "articles": summarized}
-    except FinnhubAPIException as e:
-        logger.warning(f"Finnhub company_news error for {symbol}: {e}")
-        return _handle_error("get_company_news", symbol, e)
-    except Exception as e:
-        logger.error(f"Finnhub company_news error for {symbol}: {e}", exc_info=True)
-        return _handle_error("get_company_news", symbol, e)
+@_json_result
+@_cached(ttl=3600)
+@_finnhub_call("company_news")
+def get_company_news(client: FinnhubHTTP, symbol: str, from_date: str, to_date: str) -> dict[str, Any] | str:
+    """
+    Get recent company news for `symbol` (max 5 articles, headline + summary only).
+
+    `count` is the number of articles between `searched_from` and `to_date`.
+    When the last 3 days hold at least 5 articles only that window is
+    searched, so `count` is then not the total for the whole range.
+    """
+    news, searched_from = _recent_news(client, symbol, from_date, to_date)
+    # Limit to 5 articles, extract only essential fields
+    summarized = [
+        {
+            "headline": article.get("headline"),
+            "summary": article.get("summary", "")[:200],  # Truncate long summaries
+            "source": article.get("source"),
+            "datetime": article.get("datetime"),
+        }
+        for article in news[:NEWS_ARTICLE_LIMIT]
+    ]
+    return {"symbol": symbol, "count": len(news), "searched_from": searched_from, "articles": summarized}
 
 
 @tool("get_news_sentiment")
-def get_news_sentiment(symbol: str) -> dict[str, Any]:
+@_cached(ttl=3600)
+@_finnhub_call("news_sentiment")
+def get_news_sentiment(client: FinnhubHTTP, symbol: str) -> dict[str, Any]:
     """Get aggregated news sentiment scores for `symbol`."""
-    client = _get_finnhub_client()
-    if not client:
-        return _no_key_error()
-    try:
-        data = client.news_sentiment(symbol)
-        sentiment = data.get("sentiment", {})
-        buzz = data.get("buzz", {})
-        return {
-            "symbol": symbol,
-            "companyName": data.get("companyNewsScore"),
-            "sentiment": {
-                "bullishPercent": sentiment.get("bullishPercent"),
-                "bearishPercent": sentiment.get("bearishPercent"),
-                "score": sentiment.get("score"),
-            },
-            "buzz": {
-                "articlesInLastWeek": buzz.get("articlesInLastWeek"),
-                "buzz": buzz.get("buzz"),
-            },
-            "sectorAverageBullishPercent": data.get("sectorAverageBullishPercent"),
-        }
-    except FinnhubAPIException as e:
-        logger.warning(f"Finnhub news_sentiment error for {symbol}: {e}")
-        return _handle_error("get_news_sentiment", symbol, e)
-    except Exception as e:
-        logger.error(f"Finnhub news_sentiment error for {symbol}: {e}", exc_info=True)
-        return _handle_error("get_news_sentiment", symbol, e)
+    data = client.news_sentiment(symbol)
+    sentiment = data.get("sentiment", {})
+    buzz = data.get("buzz", {})
+    return {
+        "symbol": symbol,
+        "companyName": data.get("companyNewsScore"),
+        "sentiment": {
+            "bullishPercent": sentiment.get("bullishPercent"),
+            "bearishPercent": sentiment.get("bearishPercent"),
+            "score": sentiment.get("score"),
+        },
+        "buzz": {
+            "articlesInLastWeek": buzz.get("articlesInLastWeek"),
+            "buzz": buzz.get("buzz"),
+        },
+        "sectorAverageBullishPercent": data.get("sectorAverageBullishPercent"),
+    }
 
 
 @tool("analyst_rating")
-def analyst_rating(symbol: str) -> dict[str, Any]:
+@_cached(ttl=86400)
+@_finnhub_call("recommendation_trends")
+def analyst_rating(client: FinnhubHTTP, symbol: str) -> dict[str, Any]:
     """Get analyst recommendation trends for `symbol` (last 3 months)."""
-    client = _get_finnhub_client()
-    if not client:
+    trends = client.recommendation_trends(symbol)
+    # Limit to last 3 months of data
+    recent = trends[:6] if trends else []
+    return {"symbol": symbol, "recommendations": recent}
+
+
+# Parallel requests for bulk lookups; Finnhub has no batch endpoint
+BULK_MAX_WORKERS = 8
+
+
+@tool("get_quotes_bulk")
+def get_quotes_bulk(symbols: list[str]) -> dict[str, Any]:
+    """Get real-time quotes for several symbols at once using Finnhub."""
+    if not os.getenv("FINNHUB_API_KEY"):
         return _no_key_error()
-    try:
-        trends = client.recommendation_trends(symbol)
-        # Limit to last 3 months of data
-        recent = trends[:6] if trends else []
-        return {"symbol": symbol, "recommendations": recent}
-    except FinnhubAPIException as e:
-        logger.warning(f"Finnhub recommendation_trends error for {symbol}: {e}")
-        return _handle_error("analyst_rating", symbol, e)
-    except Exception as e:
-        logger.error(f"Finnhub recommendation_trends error for {symbol}: {e}", exc_info=True)
-        return _handle_error("analyst_rating", symbol, e)
+    symbols = list(dict.fromkeys(symbols))
+    with ThreadPoolExecutor(max_workers=min(BULK_MAX_WORKERS, len(symbols) or 1)) as pool:
+        futures = {pool.submit(get_real_time_quote.func, symbol): symbol for symbol in symbols}
+        quotes = {futures[future]: future.result() for future in as_completed(futures)}
+    # Keep the caller's order
+    return {"count": len(symbols), "quotes": [quotes[symbol] for symbol in symbols]}
+
+
+@tool("get_finnhub_snapshot")
+def get_finnhub_snapshot(symbol: str) -> dict[str, Any]:
+    """
+    Get quote, key financial metrics, news sentiment, analyst ratings and
+    180 days of daily candles for `symbol` in one call using Finnhub.
+    Each section has the same shape (or error) as the individual tool.
+    """
+    if not os.getenv("FINNHUB_API_KEY"):
+        return _no_key_error()
+    # Endpoints are independent, so fetch them concurrently and return them
+    # together: one tool round trip for the agent instead of five
+    sections = {
+        "quote": get_real_time_quote,
+        "fundamentals": get_fundamental_data,
+        "news_sentiment": get_news_sentiment,
+        "analyst_ratings": analyst_rating,
+        "historical_candles": get_historical_candles,
+    }
+    with ThreadPoolExecutor(max_workers=len(sections)) as pool:
+        futures = {name: pool.submit(fetch.func, symbol) for name, fetch in sections.items()}
+        return {"symbol": symbol, **{name: future.result() for name, future in futures.items()}}
+
+
+def prewarm(symbols: list[str]) -> None:
+    """
+    Fill the response cache for `symbols` ahead of the agents' first turn.
+
+    Fetches fundamentals, news sentiment and analyst ratings concurrently
+    and discards the results. Their first tool calls are then cache hits.
+    Failures are ignored. Quotes are left out: they are cached for seconds,
+    which is less than the agents' first LLM round trip.
+    """
+    if not os.getenv("FINNHUB_API_KEY") or not symbols:
+        return
+    fetches = (get_fundamental_data, get_news_sentiment, analyst_rating)
+    with ThreadPoolExecutor(max_workers=BULK_MAX_WORKERS) as pool:
+        for symbol in symbols:
+            for fetch in fetches:
+                pool.submit(fetch.func, symbol)
+    logger.debug("Prewarmed Finnhub cache for %s", symbols)
 
 
 def get_finnhub_tools() -> list[Any]:
@@ -336,10 +677,12 @@ def get_finnhub_tools() -> list[Any]:
         raise ValueError("FINNHUB_API_KEY not provided.")
     return [
         get_real_time_quote,
+        get_quotes_bulk,
         get_historical_prices,
         get_historical_candles,
         get_fundamental_data,
         get_company_news,
         get_news_sentiment,
         analyst_rating,
+        get_finnhub_snapshot,
     ]
@@ -0,0 +1,89 @@
+import os
+from functools import lru_cache
+from typing import Any
+
+import httpx
+import orjson
+from crewai_tools import SerperDevTool
+from stock_analyser.utils.cache import TTLCache
+from stock_analyser.utils.logger import logger
+
+SEARCH_CACHE_TTL = 3600
+
+# Shared by every agent (and crew instance) in the process
+_search_cache = TTLCache(maxsize=256, ttl=SEARCH_CACHE_TTL)
+
+
+@lru_cache(maxsize=1)
+def _get_client() -> httpx.Client:
+    """
+    Shared HTTP client for Serper.
+
+    SerperDevTool posts through bare `requests.post`, which opens a new
+    connection (TCP + TLS) for every search; this keeps them alive across
+    searches and agents.
+    """
+    return httpx.Client(
+        http2=True,
+        timeout=httpx.Timeout(10.0, connect=5.0),
+        limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+    )
+
+
+def _normalize_query(query: str) -> str:
+    """
+    Normalize a search query for use as a cache key.
+
+    Only case and runs of whitespace are folded, so "GOOG  latest news" and
+    "goog latest news" share an entry. Word order and punctuation are kept:
+    "Apple acquires Beats" and "Beats acquires Apple" are different
+    searches.
+    """
+    return " ".join(query.lower().split())
+
+
+class CachedSerperDevTool(SerperDevTool):
+    """
+    SerperDevTool that reuses results of equivalent queries across agents
+    and sends searches over a pooled HTTP/2 connection.
+    """
+
+    def _make_api_request(self, search_query: str, search_type: str) -> dict[str, Any]:
+        payload: dict[str, Any] = {"q": search_query, "num": self.n_results}
+        if self.country != "":
+            payload["gl"] = self.country
+        if self.location != "":
+            payload["location"] = self.location
+        if self.locale != "":
+            payload["hl"] = self.locale
+
+        try:
+            response = _get_client().post(
+                self._get_search_url(search_type),
+                headers={"X-API-KEY": os.environ["SERPER_API_KEY"], "content-type": "application/json"},
+                content=orjson.dumps(payload),
+            )
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Error making request to Serper API: {e}\nResponse content: {e.response.text}")
+            raise
+        except httpx.HTTPError as e:
+            logger.error(f"Error making request to Serper API: {e}")
+            raise
+        results = orjson.loads(response.content)
+        if not results:
+            logger.error("Empty response from Serper API")
+            raise ValueError("Empty response from Serper API")
+        return results
+
+    def _run(self, **kwargs: Any) -> Any:
+        query = kwargs.get("search_query") or kwargs.get("query") or ""
+        key = (kwargs.get("search_type", self.search_type), _normalize_query(str(query)))
+        result = _search_cache.get(key)
+        if result is not None:
+            logger.debug("Serper cache hit for %r", query)
+            return result
+        result = super()._run(**kwargs)
+        if result:
+            _search_cache.set(key, result)
+        return result
@@ -1,16 +1,54 @@
-from typing import Any
+import hashlib
+from functools import lru_cache
+from typing import Any, Callable
 
+import numpy as np
 import pandas as pd
 import talib
 from crewai.tools import tool
 
+from stock_analyser.utils.cache import TTLCache
 from stock_analyser.utils.logger import logger
 
+# TA-Lib outputs keyed on (indicator, params, digest of the input series), so
+# agents re-running an indicator on the same candles skip the computation
+_indicator_cache = TTLCache(maxsize=128, ttl=600)
+
+
+def _indicator(func: Callable[..., Any], *series: pd.Series, **params: Any) -> Any:
+    """Call the TA-Lib function `func` on `series`, reusing a cached result for identical input."""
+    arrays = [column.to_numpy(dtype=float) for column in series]
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        digest.update(array.tobytes())
+    key = (func.__name__, tuple(sorted(params.items())), digest.digest())
+    result = _indicator_cache.get(key)
+    if result is None:
+        result = func(*arrays, **params)
+        _indicator_cache.set(key, result)
+    return result
+
+
+# Input column names (lowercased) -> the names the indicator tools use
+_COLUMN_NAMES = {"date": "date", "open": "open", "high": "high", "low": "low", "close": "close", "volume": "volume"}
+
 
 def _to_dataframe(data: Any) -> pd.DataFrame:
+    """
+    Load tool input as a DataFrame.
+
+    A DataFrame is used as is, without a copy, so it is the caller's frame:
+    the tools only read columns from it and build their results in separate
+    arrays, and must not assign into it.
+    """
     if isinstance(data, pd.DataFrame):
-        df = data.copy()
+        df = data
     elif isinstance(data, dict):
+        candles = data.get("candles")
+        if isinstance(candles, dict):
+            # Column-wise candles from the price tools: rename the keys and
+            # build the frame straight from the lists
+            return pd.DataFrame({_COLUMN_NAMES.get(str(col).lower(), col): values for col, values in candles.items()})
         if "candles" in data:
             df = pd.DataFrame(data.get("candles", []))
         else:
@@ -21,29 +59,42 @@ def _to_dataframe(data: Any) -> pd.DataFrame:
     if df.empty:
         return df
 
-    rename_map: dict[str, str] = {}
-    for col in df.columns:
-        lower = str(col).lower()
-        if lower == "close":
-            rename_map[col] = "close"
-        elif lower == "high":
-            rename_map[col] = "high"
-        elif lower == "low":
-            rename_map[col] = "low"
-        elif lower == "open":
-            rename_map[col] = "open"
-        elif lower == "date":
-            rename_map[col] = "date"
+    rename_map = {col: _COLUMN_NAMES[str(col).lower()] for col in df.columns if str(col).lower() in _COLUMN_NAMES}
     if rename_map:
         df = df.rename(columns=rename_map)
     return df
 
 
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    """Shift `values` by `periods` like `Series.shift`, filling with NaN."""
+    shifted = np.full_like(values, np.nan)
+    if periods > 0:
+        shifted[periods:] = values[:-periods]
+    elif periods < 0:
+        shifted[:periods] = values[-periods:]
+    else:
+        shifted[:] = values
+    return shifted
+
+
+def _tail(columns: dict[str, np.ndarray], n_tail: int) -> dict[str, list[float]]:
+    # Agents read the latest values; skip the warm-up rows and older history
+    # instead of putting every row into the prompt. Output is column-wise
+    # ({"RSI": [...]}) like the candle tools, built from the TA-Lib arrays
+    # without a dict per row; _to_dataframe and the plots load it as is.
+    names = list(columns)
+    values = np.column_stack([columns[name] for name in names])
+    values = values[~np.isnan(values).all(axis=1)]
+    values = values[max(len(values) - n_tail, 0):]
+    return dict(zip(names, values.T.tolist()))
+
+
 @tool("calculate_ichimoku_cloud")
-def calculate_ichimoku_cloud(df: Any) -> dict[str, Any] | list[dict[str, Any]]:
+def calculate_ichimoku_cloud(df: Any, n_tail: int = 60) -> dict[str, Any]:
     """
     Calculates the Ichimoku Cloud for a given DataFrame of historical prices.
     The data should have 'high', 'low', 'close' columns.
+    Returns the last `n_tail` values of each indicator column.
     """
     logger.debug("Calculating Ichimoku Cloud.")
     try:
@@ -53,45 +104,49 @@ def calculate_ichimoku_cloud(df: Any) -> dict[str, Any] | list[dict[str, Any]]:
         if not {"high", "low", "close"}.issubset(data.columns):
             return {"error": "Missing data for Ichimoku Cloud calculation: requires high, low, close"}
 
-        high_9 = data["high"].rolling(window=9).max()
-        low_9 = data["low"].rolling(window=9).min()
-        data["tenkan_sen"] = (high_9 + low_9) / 2
-
-        high_26 = data["high"].rolling(window=26).max()
-        low_26 = data["low"].rolling(window=26).min()
-        data["kijun_sen"] = (high_26 + low_26) / 2
-
-        data["senkou_span_a"] = ((data["tenkan_sen"] + data["kijun_sen"]) / 2).shift(26)
-
-        high_52 = data["high"].rolling(window=52).max()
-        low_52 = data["low"].rolling(window=52).min()
-        data["senkou_span_b"] = ((high_52 + low_52) / 2).shift(26)
+        # TA-Lib's MAX/MIN run each rolling window as one C loop over the
+        # raw arrays, without building intermediate Series
+        high = data["high"].to_numpy(dtype=float)
+        low = data["low"].to_numpy(dtype=float)
 
-        data["chikou_span"] = data["close"].shift(-26)
+        tenkan_sen = (talib.MAX(high, timeperiod=9) + talib.MIN(low, timeperiod=9)) / 2
+        kijun_sen = (talib.MAX(high, timeperiod=26) + talib.MIN(low, timeperiod=26)) / 2
+        span_b = (talib.MAX(high, timeperiod=52) + talib.MIN(low, timeperiod=52)) / 2
 
         logger.debug("Ichimoku Cloud calculated successfully.")
-        return data[["tenkan_sen", "kijun_sen", "senkou_span_a", "senkou_span_b", "chikou_span"]].to_dict("records")
+        return _tail({
+            "tenkan_sen": tenkan_sen,
+            "kijun_sen": kijun_sen,
+            "senkou_span_a": _shift((tenkan_sen + kijun_sen) / 2, 26),
+            "senkou_span_b": _shift(span_b, 26),
+            "chikou_span": _shift(data["close"].to_numpy(dtype=float), -26),
+        }, n_tail)
     except Exception as e:
         logger.error(f"An unexpected error occurred during Ichimoku Cloud calculation: {e}", exc_info=True)
         return {"error": str(e)}
 
 
+# Retracement levels between the 0% (high) and 100% (low) endpoints
+_FIB_LEVELS = ("23.6%", "38.2%", "50%", "61.8%")
+_FIB_RATIOS = np.array([0.236, 0.382, 0.5, 0.618])
+
+
+@lru_cache(maxsize=4096)
+def _fibonacci_levels(high: float, low: float) -> dict[str, float]:
+    # Pure in (high, low), and agents often ask again for the same swing
+    inner = high - _FIB_RATIOS * (high - low)
+    return {"0%": high, **dict(zip(_FIB_LEVELS, inner.tolist())), "100%": low}
+
+
 @tool("calculate_fibonacci_retracements")
 def calculate_fibonacci_retracements(high: float, low: float) -> dict[str, Any]:
     """
     Calculates Fibonacci Retracement levels given a high and a low point.
     """
-    logger.debug(f"Calculating Fibonacci Retracements for high: {high}, low: {low}")
+    logger.debug("Calculating Fibonacci Retracements for high: %s, low: %s", high, low)
     try:
-        diff = high - low
-        levels = {
-            "0%": high,
-            "23.6%": high - 0.236 * diff,
-            "38.2%": high - 0.382 * diff,
-            "50%": high - 0.5 * diff,
-            "61.8%": high - 0.618 * diff,
-            "100%": low,
-        }
+        # Copy, so the cached levels are never handed out for mutation
+        levels = dict(_fibonacci_levels(high, low))
         logger.debug("Fibonacci Retracements calculated successfully.")
         return levels
     except Exception as e:
@@ -99,13 +154,39 @@ def calculate_fibonacci_retracements(high: float, low: float) -> dict[str, Any]:
         return {"error": str(e)}
 
 
+@tool("calculate_fibonacci_retracements_batch")
+def calculate_fibonacci_retracements_batch(highs: list[float], lows: list[float]) -> dict[str, Any]:
+    """
+    Calculates Fibonacci Retracement levels for several (high, low) swings at once.
+    `highs` and `lows` are paired by position.
+    """
+    logger.debug("Calculating Fibonacci Retracements for %s swings", len(highs))
+    try:
+        if len(highs) != len(lows):
+            return {"error": "highs and lows must have the same length"}
+        high = np.asarray(highs, dtype=float)
+        low = np.asarray(lows, dtype=float)
+        # All swings in one broadcast: row i holds the inner levels of swing i
+        inner = high[:, None] - _FIB_RATIOS[None, :] * (high - low)[:, None]
+        levels = [
+            {"0%": h, **dict(zip(_FIB_LEVELS, row)), "100%": l}
+            for h, l, row in zip(high.tolist(), low.tolist(), inner.tolist())
+        ]
+        logger.debug("Fibonacci Retracements calculated successfully.")
+        return {"levels": levels}
+    except Exception as e:
+        logger.error(f"An unexpected error occurred during Fibonacci Retracements calculation: {e}", exc_info=True)
+        return {"error": str(e)}
+
+
 @tool("calculate_moving_averages")
-def calculate_moving_averages(df: Any, timeperiod: int = 20) -> dict[str, Any] | list[dict[str, Any]]:
+def calculate_moving_averages(df: Any, timeperiod: int = 20, n_tail: int = 60) -> dict[str, Any]:
     """
     Calculates Simple Moving Average (SMA) and Exponential Moving Average (EMA).
     The data should have a 'close' column.
+    Returns the last `n_tail` values of each indicator column.
     """
-    logger.debug(f"Calculating Moving Averages with timeperiod: {timeperiod}")
+    logger.debug("Calculating Moving Averages with timeperiod: %s", timeperiod)
     try:
         data = _to_dataframe(df)
         if data.empty:
@@ -113,22 +194,23 @@ def calculate_moving_averages(df: Any, timeperiod: int = 20) -> dict[str, Any] |
         if "close" not in data.columns:
             return {"error": "Missing data for Moving Averages calculation: requires close"}
 
-        data["SMA"] = talib.SMA(data["close"], timeperiod=timeperiod)
-        data["EMA"] = talib.EMA(data["close"], timeperiod=timeperiod)
+        sma = _indicator(talib.SMA, data["close"], timeperiod=timeperiod)
+        ema = _indicator(talib.EMA, data["close"], timeperiod=timeperiod)
         logger.debug("Moving Averages calculated successfully.")
-        return data[["SMA", "EMA"]].to_dict("records")
+        return _tail({"SMA": sma, "EMA": ema}, n_tail)
     except Exception as e:
         logger.error(f"An unexpected error occurred during Moving Averages calculation: {e}", exc_info=True)
         return {"error": str(e)}
 
 
 @tool("calculate_rsi")
-def calculate_rsi(df: Any, timeperiod: int = 14) -> dict[str, Any] | list[dict[str, Any]]:
+def calculate_rsi(df: Any, timeperiod: int = 14, n_tail: int = 60) -> dict[str, Any]:
     """
     Calculates the Relative Strength Index (RSI).
     The data should have a 'close' column.
+    Returns the last `n_tail` values of each indicator column.
     """
-    logger.debug(f"Calculating RSI with timeperiod: {timeperiod}")
+    logger.debug("Calculating RSI with timeperiod: %s", timeperiod)
     try:
         data = _to_dataframe(df)
         if data.empty:
@@ -136,9 +218,9 @@ def calculate_rsi(df: Any, timeperiod: int = 14) -> dict[str, Any] | list[dict[s
         if "close" not in data.columns:
             return {"error": "Missing data for RSI calculation: requires close"}
 
-        data["RSI"] = talib.RSI(data["close"], timeperiod=timeperiod)
+        rsi = _indicator(talib.RSI, data["close"], timeperiod=timeperiod)
         logger.debug("RSI calculated successfully.")
-        return data[["RSI"]].to_dict("records")
+        return _tail({"RSI": rsi}, n_tail)
     except Exception as e:
         logger.error(f"An unexpected error occurred during RSI calculation: {e}", exc_info=True)
         return {"error": str(e)}
@@ -146,14 +228,16 @@ def calculate_rsi(df: Any, timeperiod: int = 14) -> dict[str, Any] | list[dict[s
 
 @tool("calculate_macd")
 def calculate_macd(
-    df: Any, fastperiod: int = 12, slowperiod: int = 26, signalperiod: int = 9
-) -> dict[str, Any] | list[dict[str, Any]]:
+    df: Any, fastperiod: int = 12, slowperiod: int = 26, signalperiod: int = 9, n_tail: int = 60
+) -> dict[str, Any]:
     """
     Calculates the Moving Average Convergence Divergence (MACD).
     The data should have a 'close' column.
+    Returns the last `n_tail` values of each indicator column.
     """
     logger.debug(
-        f"Calculating MACD with fastperiod: {fastperiod}, slowperiod: {slowperiod}, signalperiod: {signalperiod}"
+        "Calculating MACD with fastperiod: %s, slowperiod: %s, signalperiod: %s",
+        fastperiod, slowperiod, signalperiod,
     )
     try:
         data = _to_dataframe(df)
@@ -162,14 +246,11 @@ def calculate_macd(
         if "close" not in data.columns:
             return {"error": "Missing data for MACD calculation: requires close"}
 
-        macd, macdsignal, macdhist = talib.MACD(
-            data["close"], fastperiod=fastperiod, slowperiod=slowperiod, signalperiod=signalperiod
+        macd, macdsignal, macdhist = _indicator(
+            talib.MACD, data["close"], fastperiod=fastperiod, slowperiod=slowperiod, signalperiod=signalperiod
         )
-        data["MACD"] = macd
-        data["MACD_Signal"] = macdsignal
-        data["MACD_Hist"] = macdhist
         logger.debug("MACD calculated successfully.")
-        return data[["MACD", "MACD_Signal", "MACD_Hist"]].to_dict("records")
+        return _tail({"MACD": macd, "MACD_Signal": macdsignal, "MACD_Hist": macdhist}, n_tail)
     except Exception as e:
         logger.error(f"An unexpected error occurred during MACD calculation: {e}", exc_info=True)
         return {"error": str(e)}
@@ -177,13 +258,14 @@ def calculate_macd(
 
 @tool("calculate_bollinger_bands")
 def calculate_bollinger_bands(
-    df: Any, timeperiod: int = 20, nbdevup: int = 2, nbdevdn: int = 2
-) -> dict[str, Any] | list[dict[str, Any]]:
+    df: Any, timeperiod: int = 20, nbdevup: int = 2, nbdevdn: int = 2, n_tail: int = 60
+) -> dict[str, Any]:
     """
     Calculates Bollinger Bands.
     The data should have a 'close' column.
+    Returns the last `n_tail` values of each indicator column.
     """
-    logger.debug(f"Calculating Bollinger Bands with timeperiod: {timeperiod}")
+    logger.debug("Calculating Bollinger Bands with timeperiod: %s", timeperiod)
     try:
         data = _to_dataframe(df)
         if data.empty:
@@ -191,26 +273,24 @@ def calculate_bollinger_bands(
         if "close" not in data.columns:
             return {"error": "Missing data for Bollinger Bands calculation: requires close"}
 
-        upper, middle, lower = talib.BBANDS(
-            data["close"], timeperiod=timeperiod, nbdevup=nbdevup, nbdevdn=nbdevdn
+        upper, middle, lower = _indicator(
+            talib.BBANDS, data["close"], timeperiod=timeperiod, nbdevup=nbdevup, nbdevdn=nbdevdn
         )
-        data["Bollinger_Upper"] = upper
-        data["Bollinger_Middle"] = middle
-        data["Bollinger_Lower"] = lower
         logger.debug("Bollinger Bands calculated successfully.")
-        return data[["Bollinger_Upper", "Bollinger_Middle", "Bollinger_Lower"]].to_dict("records")
+        return _tail({"Bollinger_Upper": upper, "Bollinger_Middle": middle, "Bollinger_Lower": lower}, n_tail)
     except Exception as e:
         logger.error(f"An unexpected error occurred during Bollinger Bands calculation: {e}", exc_info=True)
         return {"error": str(e)}
 
 
 @tool("calculate_atr")
-def calculate_atr(df: Any, timeperiod: int = 14) -> dict[str, Any] | list[dict[str, Any]]:
+def calculate_atr(df: Any, timeperiod: int = 14, n_tail: int = 60) -> dict[str, Any]:
     """
     Calculates the Average True Range (ATR).
     The data should have 'high', 'low', 'close' columns.
+    Returns the last `n_tail` values of each indicator column.
     """
-    logger.debug(f"Calculating ATR with timeperiod: {timeperiod}")
+    logger.debug("Calculating ATR with timeperiod: %s", timeperiod)
     try:
         data = _to_dataframe(df)
         if data.empty:
@@ -218,18 +298,61 @@ def calculate_atr(df: Any, timeperiod: int = 14) -> dict[str, Any] | list[dict[s
         if not {"high", "low", "close"}.issubset(data.columns):
             return {"error": "Missing data for ATR calculation: requires high, low, close"}
 
-        data["ATR"] = talib.ATR(data["high"], data["low"], data["close"], timeperiod=timeperiod)
+        atr = _indicator(talib.ATR, data["high"], data["low"], data["close"], timeperiod=timeperiod)
         logger.debug("ATR calculated successfully.")
-        return data[["ATR"]].to_dict("records")
+        return _tail({"ATR": atr}, n_tail)
     except Exception as e:
         logger.error(f"An unexpected error occurred during ATR calculation: {e}", exc_info=True)
         return {"error": str(e)}
 
 
+@tool("calculate_all_indicators")
+def calculate_all_indicators(df: Any, n_tail: int = 60) -> dict[str, Any]:
+    """
+    Calculates SMA/EMA (20), RSI (14), MACD (12/26/9), Bollinger Bands (20, 2) and,
+    when 'high' and 'low' are present, ATR (14) in one call.
+    The data should have a 'close' column.
+    Returns the last `n_tail` values of each indicator column.
+    """
+    logger.debug("Calculating all indicators.")
+    try:
+        data = _to_dataframe(df)
+        if data.empty:
+            return {"error": "Missing data for indicator calculation: empty dataset"}
+        if "close" not in data.columns:
+            return {"error": "Missing data for indicator calculation: requires close"}
+
+        # Load the input once and run every indicator over the same arrays,
+        # instead of one tool call (and one DataFrame) per indicator
+        close = data["close"]
+        macd, macd_signal, macd_hist = _indicator(talib.MACD, close, fastperiod=12, slowperiod=26, signalperiod=9)
+        upper, middle, lower = _indicator(talib.BBANDS, close, timeperiod=20, nbdevup=2, nbdevdn=2)
+        columns = {
+            "SMA": _indicator(talib.SMA, close, timeperiod=20),
+            "EMA": _indicator(talib.EMA, close, timeperiod=20),
+            "RSI": _indicator(talib.RSI, close, timeperiod=14),
+            "MACD": macd,
+            "MACD_Signal": macd_signal,
+            "MACD_Hist": macd_hist,
+            "Bollinger_Upper": upper,
+            "Bollinger_Middle": middle,
+            "Bollinger_Lower": lower,
+        }
+        if {"high", "low"}.issubset(data.columns):
+            columns["ATR"] = _indicator(talib.ATR, data["high"], data["low"], close, timeperiod=14)
+        logger.debug("All indicators calculated successfully.")
+        return _tail(columns, n_tail)
+    except Exception as e:
+        logger.error(f"An unexpected error occurred during indicator calculation: {e}", exc_info=True)
+        return {"error": str(e)}
+
+
 def get_technical_analysis_tools() -> list[Any]:
     return [
+        calculate_all_indicators,
         calculate_ichimoku_cloud,
         calculate_fibonacci_retracements,
+        calculate_fibonacci_retracements_batch,
         calculate_moving_averages,
         calculate_rsi,
         calculate_macd,
@@ -1,36 +1,111 @@
-import base64
 import io
-from typing import Any
+import queue
+from typing import TYPE_CHECKING, Any, Callable, ClassVar
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
+import pybase64
 import talib
 from crewai.tools import BaseTool
+from stock_analyser.utils.downsample import lttb_indices
 from stock_analyser.utils.logger import logger
 
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
 import logging
 logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
 
+PLOT_DPI = 80
+
+# Longer series are reduced to this many points (LTTB) before drawing; an
+# 800px-wide chart can't show more, and the renderer's cost is per point
+MAX_PLOT_POINTS = 2000
+
+# Agg canvases are cleared and redrawn for every plot instead of creating
+# (and tearing down) a pyplot figure per call. A figure isn't thread-safe,
+# so each render takes one out of the pool; the pool grows to the peak
+# number of concurrent renders.
+_canvas_pool: "queue.SimpleQueue[FigureCanvasAgg]" = queue.SimpleQueue()
+
+
+def _new_canvas() -> "FigureCanvasAgg":
+    # matplotlib is imported on the first plot rather than with the module,
+    # so runs that never plot skip its import time and font cache
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    return FigureCanvasAgg(Figure(figsize=(10, 6), dpi=PLOT_DPI))
+
+
+def _values(series: pd.Series) -> np.ndarray:
+    # float32 is plenty for screen coordinates and halves what matplotlib
+    # transforms and rasterizes
+    return series.to_numpy(dtype=np.float32)
+
+
+def _render(draw: Callable[["Axes"], None]) -> str:
+    """Draw a plot onto a pooled figure and return it as a base64 WebP image."""
+    try:
+        canvas = _canvas_pool.get_nowait()
+    except queue.Empty:
+        canvas = _new_canvas()
+    try:
+        figure = canvas.figure
+        figure.clf()
+        ax = figure.add_subplot(111)
+        draw(ax)
+        ax.grid(True)
+        ax.tick_params(axis='x', labelrotation=45)
+        # Fixed margins fit the rotated date labels without tight_layout's
+        # extra layout pass
+        figure.subplots_adjust(left=0.08, right=0.97, bottom=0.2, top=0.93)
+        img_buffer = io.BytesIO()
+        # Lossless WebP: markedly smaller than PNG for flat-colour charts,
+        # with text and thin lines kept sharp
+        canvas.print_webp(img_buffer, pil_kwargs={'lossless': True})
+    finally:
+        _canvas_pool.put(canvas)
+    # pybase64's SIMD encoder is several times faster than the stdlib's
+    return pybase64.b64encode(img_buffer.getvalue()).decode('ascii')
+
+
+# Input column names (lowercased) -> the names the plot methods use
+_COLUMN_NAMES = {
+    "date": "Date",
+    "close": "Close",
+    "macd": "MACD",
+    "macd_line": "MACD",
+    "signal_line": "Signal_Line",
+    "signal": "Signal_Line",
+    "macd_signal": "Signal_Line",
+    "histogram": "Histogram",
+    "macd_hist": "Histogram",
+    "macd_histogram": "Histogram",
+    "rsi": "RSI",
+}
+
 class VisualizationTools(BaseTool):
     name: str = "Visualization Tools"
     description: str = "Tools for generating various stock-related plots."
 
     def _run(self, tool_name: str, **kwargs):
-        if tool_name == "plot_stock_prices":
-            return self.plot_stock_prices(**kwargs)
-        elif tool_name == "plot_macd":
-            return self.plot_macd(**kwargs)
-        elif tool_name == "plot_rsi":
-            return self.plot_rsi(**kwargs)
-        else:
+        plot = self._PLOTS.get(tool_name)
+        if plot is None:
             raise ValueError(f"Unknown Visualization tool name: {tool_name}")
+        return plot(self, **kwargs)
 
     def _to_dataframe(self, data: Any) -> pd.DataFrame:
         if isinstance(data, pd.DataFrame):
             df = data.copy()
         elif isinstance(data, dict):
-            if "candles" in data:
-                df = pd.DataFrame(data.get("candles", []))
+            candles = data.get("candles")
+            if isinstance(candles, dict):
+                # Column-wise candles from the price tools: rename the keys
+                # and build the frame straight from the lists
+                df = pd.DataFrame({_COLUMN_NAMES.get(str(col).lower(), col): values for col, values in candles.items()})
+            elif "candles" in data:
+                df = pd.DataFrame.from_records(data.get("candles", []))
             elif "t" in data and "c" in data:
                 df = pd.DataFrame({
                     "Date": data.get("t", []),
@@ -38,27 +113,15 @@ class VisualizationTools(BaseTool):
                 })
             else:
                 df = pd.DataFrame(data)
+        elif isinstance(data, list) and data and isinstance(data[0], dict):
+            df = pd.DataFrame.from_records(data)
         else:
             df = pd.DataFrame(data)
 
         if df.empty:
             return df
 
-        rename_map: dict[str, str] = {}
-        for col in df.columns:
-            lower = str(col).lower()
-            if lower == "date":
-                rename_map[col] = "Date"
-            elif lower == "close":
-                rename_map[col] = "Close"
-            elif lower in {"macd", "macd_line"}:
-                rename_map[col] = "MACD"
-            elif lower in {"signal_line", "signal", "macd_signal"}:
-                rename_map[col] = "Signal_Line"
-            elif lower in {"histogram", "macd_hist", "macd_histogram"}:
-                rename_map[col] = "Histogram"
-            elif lower == "rsi":
-                rename_map[col] = "RSI"
+        rename_map = {col: _COLUMN_NAMES[str(col).lower()] for col in df.columns if str(col).lower() in _COLUMN_NAMES}
         if rename_map:
             df = df.rename(columns=rename_map)
 
@@ -72,10 +135,22 @@ class VisualizationTools(BaseTool):
                 df["Date"] = pd.to_datetime(df["Date"], unit="s", errors="coerce")
             else:
                 df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-            df = df.dropna(subset=["Date"]).sort_values("Date")
+            # Price tools return bars in order; only clean up when needed
+            if df["Date"].isna().any():
+                df = df.dropna(subset=["Date"])
+            if not df["Date"].is_monotonic_increasing:
+                df = df.sort_values("Date")
 
         return df
 
+    def _downsample(self, df: pd.DataFrame, column: str) -> pd.DataFrame:
+        """Keep at most MAX_PLOT_POINTS rows of `df`, chosen by LTTB on `column`."""
+        if len(df) <= MAX_PLOT_POINTS:
+            return df
+        x = df['Date'].to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(float)
+        y = df[column].to_numpy(dtype=float)
+        return df.iloc[lttb_indices(x, y, MAX_PLOT_POINTS)]
+
     def plot_stock_prices(self, historical_data: pd.DataFrame, ticker: str) -> str:
         """
         Generates a line plot of historical stock prices.
@@ -85,29 +160,23 @@ class VisualizationTools(BaseTool):
             ticker: Stock ticker symbol.
 
         Returns:
-            A base64 encoded string of the plot image.
+            A base64 encoded string of the plot image (WebP).
         """
-        logger.debug(f"Attempting to plot stock prices for {ticker}.")
+        logger.debug("Attempting to plot stock prices for %s.", ticker)
         try:
             df = self._to_dataframe(historical_data)
             if df.empty or "Date" not in df.columns or "Close" not in df.columns:
                 return "Error: Missing data for plotting stock prices. Ensure 'Date' and 'Close' are available."
+            df = self._downsample(df, 'Close')
 
-            plt.figure(figsize=(10, 6))
-            plt.plot(df['Date'], df['Close'], marker='o', linestyle='-')
-            plt.title(f'{ticker} Stock Price Trend')
-            plt.xlabel('Date')
-            plt.ylabel('Close Price')
-            plt.grid(True)
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png')
-            img_buffer.seek(0)
-            img_str = base64.b64encode(img_buffer.read()).decode('utf-8')
-            plt.close()
-            logger.debug(f"Successfully plotted stock prices for {ticker}.")
+            def draw(ax: "Axes"):
+                ax.plot(df['Date'], _values(df['Close']), marker='o', linestyle='-')
+                ax.set_title(f'{ticker} Stock Price Trend')
+                ax.set_xlabel('Date')
+                ax.set_ylabel('Close Price')
+
+            img_str = _render(draw)
+            logger.debug("Successfully plotted stock prices for %s.", ticker)
             return img_str
         except KeyError as e:
             logger.error(f"Error plotting stock prices: Missing column {e}. Ensure 'Date' and 'Close' columns exist.", exc_info=True)
@@ -125,9 +194,9 @@ class VisualizationTools(BaseTool):
             ticker: Stock ticker symbol.
 
         Returns:
-            A base64 encoded string of the plot image.
+            A base64 encoded string of the plot image (WebP).
         """
-        logger.debug(f"Attempting to plot MACD for {ticker}.")
+        logger.debug("Attempting to plot MACD for %s.", ticker)
         try:
             df = self._to_dataframe(data)
             if df.empty or "Date" not in df.columns:
@@ -148,25 +217,19 @@ class VisualizationTools(BaseTool):
             plot_df = plot_df.dropna(subset=["MACD", "Signal_Line", "Histogram"])
             if plot_df.empty:
                 return "Error: Not enough data points to plot MACD."
+            plot_df = self._downsample(plot_df, 'MACD')
+
+            def draw(ax: "Axes"):
+                ax.plot(plot_df['Date'], _values(plot_df['MACD']), label='MACD', color='blue')
+                ax.plot(plot_df['Date'], _values(plot_df['Signal_Line']), label='Signal Line', color='red')
+                ax.bar(plot_df['Date'], _values(plot_df['Histogram']), label='Histogram', color='gray', alpha=0.7)
+                ax.set_title(f'{ticker} MACD Indicator')
+                ax.set_xlabel('Date')
+                ax.set_ylabel('Value')
+                ax.legend()
 
-            plt.figure(figsize=(10, 6))
-            plt.plot(plot_df['Date'], plot_df['MACD'], label='MACD', color='blue')
-            plt.plot(plot_df['Date'], plot_df['Signal_Line'], label='Signal Line', color='red')
-            plt.bar(plot_df['Date'], plot_df['Histogram'], label='Histogram', color='gray', alpha=0.7)
-            plt.title(f'{ticker} MACD Indicator')
-            plt.xlabel('Date')
-            plt.ylabel('Value')
-            plt.legend()
-            plt.grid(True)
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png')
-            img_buffer.seek(0)
-            img_str = base64.b64encode(img_buffer.read()).decode('utf-8')
-            plt.close()
-            logger.debug(f"Successfully plotted MACD for {ticker}.")
+            img_str = _render(draw)
+            logger.debug("Successfully plotted MACD for %s.", ticker)
             return img_str
         except KeyError as e:
             logger.error(f"Error plotting MACD: Missing column {e}. Ensure 'Date', 'MACD', 'Signal_Line', and 'Histogram' columns exist.", exc_info=True)
@@ -184,9 +247,9 @@ class VisualizationTools(BaseTool):
             ticker: Stock ticker symbol.
 
         Returns:
-            A base64 encoded string of the plot image.
+            A base64 encoded string of the plot image (WebP).
         """
-        logger.debug(f"Attempting to plot RSI for {ticker}.")
+        logger.debug("Attempting to plot RSI for %s.", ticker)
         try:
             df = self._to_dataframe(data)
             if df.empty or "Date" not in df.columns:
@@ -204,25 +267,19 @@ class VisualizationTools(BaseTool):
             plot_df = plot_df.dropna(subset=["RSI"])
             if plot_df.empty:
                 return "Error: Not enough data points to plot RSI."
+            plot_df = self._downsample(plot_df, 'RSI')
 
-            plt.figure(figsize=(10, 6))
-            plt.plot(plot_df['Date'], plot_df['RSI'], label='RSI', color='purple')
-            plt.axhline(70, color='red', linestyle='--', label='Overbought (70)')
-            plt.axhline(30, color='green', linestyle='--', label='Oversold (30)')
-            plt.title(f'{ticker} RSI Indicator')
-            plt.xlabel('Date')
-            plt.ylabel('RSI Value')
-            plt.legend()
-            plt.grid(True)
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png')
-            img_buffer.seek(0)
-            img_str = base64.b64encode(img_buffer.read()).decode('utf-8')
-            plt.close()
-            logger.debug(f"Successfully plotted RSI for {ticker}.")
+            def draw(ax: "Axes"):
+                ax.plot(plot_df['Date'], _values(plot_df['RSI']), label='RSI', color='purple')
+                ax.axhline(70, color='red', linestyle='--', label='Overbought (70)')
+                ax.axhline(30, color='green', linestyle='--', label='Oversold (30)')
+                ax.set_title(f'{ticker} RSI Indicator')
+                ax.set_xlabel('Date')
+                ax.set_ylabel('RSI Value')
+                ax.legend()
+
+            img_str = _render(draw)
+            logger.debug("Successfully plotted RSI for %s.", ticker)
             return img_str
         except KeyError as e:
             logger.error(f"Error plotting RSI: Missing column {e}. Ensure 'Date' and 'RSI' columns exist.", exc_info=True)
@@ -230,3 +287,10 @@ class VisualizationTools(BaseTool):
         except Exception as e:
             logger.error(f"An unexpected error occurred during plotting RSI for {ticker}: {e}", exc_info=True)
             return f"Error: An unexpected error occurred during plotting RSI for {ticker}: {e}"
+
+    # Tool name -> plot method, looked up by _run
+    _PLOTS: ClassVar[dict[str, Callable[..., str]]] = {
+        "plot_stock_prices": plot_stock_prices,
+        "plot_macd": plot_macd,
+        "plot_rsi": plot_rsi,
+    }
@@ -1,20 +1,100 @@
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from multiprocessing import util as mp_util
+
+# Fields (e.g. ticker, llm) prepended to every log line in the current context
+_log_context: ContextVar[str] = ContextVar("log_context", default="")
+
+# Fallback for threads that start with an empty context, such as the
+# threads CrewAI runs async tasks in
+_process_log_context = ""
+
+
+def _format_context(fields: dict) -> str:
+    return "".join(f"[{key}={value}] " for key, value in fields.items())
+
+
+def bind_log_context(**fields):
+    """
+    Attach fields to all log records emitted from the current context.
+
+    Each asyncio task runs in its own copy of the context, so fields bound
+    inside a task are dropped when the task ends.
+    """
+    _log_context.set(_format_context(fields))
+
+
+def bind_process_log_context(**fields):
+    """
+    Attach fields to all log records emitted by this process.
+
+    For processes that run one job at a time (crew pool workers): new
+    threads don't inherit context variables, so the fields also apply to
+    records from threads that have none bound.
+    """
+    global _process_log_context
+    _process_log_context = _format_context(fields)
+    _log_context.set(_process_log_context)
+
+
+class _ProcessQueueHandler(QueueHandler):
+    """
+    QueueHandler that runs its own listener thread in every process.
+
+    Callers only enqueue records; the listener does the file and stream
+    writes. Forked children (the crew process pool) inherit this handler
+    but not the parent's listener thread, so the first record logged in a
+    new process starts a listener there, on a fresh queue that holds none
+    of the parent's pending records.
+    """
+
+    def __init__(self, *handlers: logging.Handler):
+        super().__init__(queue.SimpleQueue())
+        self._handlers = handlers
+        self._pid: int | None = None
+        self._start_lock = threading.Lock()
+
+    def _start_listener(self):
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.SimpleQueue()
+            listener = QueueListener(self.queue, *self._handlers, respect_handler_level=True)
+            listener.start()
+            # Flush at exit. multiprocessing workers leave through os._exit and
+            # skip atexit, but run these finalizers (as does normal interpreter exit).
+            mp_util.Finalize(None, listener.stop, exitpriority=10)
+            self._pid = os.getpid()
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self._start_listener()
+        super().enqueue(record)
+
+
+class _ContextFilter(logging.Filter):
+    def filter(self, record):
+        record.context = _log_context.get() or _process_log_context
+        return True
+
 
 def setup_logging():
     log_dir = "logs"
     os.makedirs(log_dir, exist_ok=True)
 
     logger = logging.getLogger('stock_analyser')
-    logger.setLevel(logging.INFO)
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
 
     # Avoid duplicate handlers if setup_logging is called multiple times.
     if logger.handlers:
         return logger
 
     log_format = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        '%(asctime)s - %(name)s - %(levelname)s - %(context)s%(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
 
@@ -32,8 +112,10 @@ def setup_logging():
     stream_handler = logging.StreamHandler()
     stream_handler.setFormatter(log_format)
 
-    logger.addHandler(file_handler)
-    logger.addHandler(stream_handler)
+    # The context filter runs on the logger, so fields are captured in the
+    # calling thread before the record is queued.
+    logger.addFilter(_ContextFilter())
+    logger.addHandler(_ProcessQueueHandler(file_handler, stream_handler))
     logger.propagate = False
 
     return logger
@@ -0,0 +1,29 @@
+from functools import lru_cache
+from pathlib import Path
+
+OUTPUT_DIR = Path("output")
+
+# Repository root (src/stock_analyser/utils/paths.py -> three levels up).
+# On-disk caches live under it rather than the working directory, so they
+# don't end up wherever the server or CLI happened to be started.
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+CACHE_DIR = PROJECT_ROOT / ".cache"
+
+
+@lru_cache(maxsize=1024)
+def get_report_path(ticker: str, llm_model: str) -> Path:
+    """
+    Path of the markdown report for a ticker analysed with `llm_model`.
+
+    Used by both the crew (which writes the report) and the backend, so the
+    naming can't drift. Slashes in provider-prefixed model names are replaced.
+    """
+    safe_model = llm_model.replace("/", "_")
+    return OUTPUT_DIR / f"{ticker}_{safe_model}_report.md"
+
+
+@lru_cache(maxsize=1)
+def ensure_output_dir() -> Path:
+    """Create the report directory on first call; later calls are free."""
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    return OUTPUT_DIR
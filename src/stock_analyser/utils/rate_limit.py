@@ -0,0 +1,32 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Blocking token bucket: allows bursts of up to `rate` calls, refilled
+    evenly over `per` seconds. Safe to share between threads, but state is
+    per process: separate processes each get their own bucket.
+
+    Callers that find the bucket empty reserve the next token and sleep
+    until it is due, so waiting threads are served in arrival order.
+    """
+
+    def __init__(self, rate: int, per: float = 60.0):
+        self.capacity = float(rate)
+        self.refill_rate = rate / per
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available. Returns the wait in seconds."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.refill_rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait